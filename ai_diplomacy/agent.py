@@ -1,17 +1,34 @@
 import logging
 import os
+from collections import deque
+from functools import cache, lru_cache
+from itertools import islice
+from string import Template
+from collections.abc import Iterator
 from typing import List, Dict, Optional
 import json
 import re
-import json_repair
-import json5  # More forgiving JSON parser
 import ast # For literal_eval
 
+try:
+    import orjson  # Optional: faster C parser/serializer for well-formed JSON
+    _fast_json_loads = orjson.loads
+
+    def _fast_json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _fast_json_loads = json.loads
+    _fast_json_dumps = json.dumps
+
 # Assuming BaseModelClient is importable from clients.py in the same directory
 from .clients import BaseModelClient, load_model_client 
-# Import load_prompt and the new logging wrapper from utils
-from .utils import load_prompt, run_llm_and_log, log_llm_response
-from .prompt_constructor import build_context_prompt # Added import
+# Import the cached prompt reader and the logging wrapper from utils
+from .utils import (
+    cached_read_text,
+    run_llm_and_log,
+    log_llm_response,
+)
+from .llm_cache import llm_cache_key, get_cached_llm_response, store_llm_response
 from .clients import GameHistory
 from diplomacy import Game
 
@@ -19,28 +36,192 @@ logger = logging.getLogger(__name__)
 
 # == Best Practice: Define constants at module level ==
 ALL_POWERS = frozenset({"AUSTRIA", "ENGLAND", "FRANCE", "GERMANY", "ITALY", "RUSSIA", "TURKEY"})
-ALLOWED_RELATIONSHIPS = ["Enemy", "Unfriendly", "Neutral", "Friendly", "Ally"]
+# Fixed power ordinals; frozenset iteration order varies with the hash seed
+POWER_ORDER = tuple(sorted(ALL_POWERS))
+POWER_IDX = {name: i for i, name in enumerate(POWER_ORDER)}
+# Ordered for display in prompts; use the set for membership checks
+ALLOWED_RELATIONSHIPS = ("Enemy", "Unfriendly", "Neutral", "Friendly", "Ally")
+ALLOWED_RELATIONSHIPS_SET = frozenset(ALLOWED_RELATIONSHIPS)
+# Caps for the bounded in-memory journals (full_private_diary stays unbounded)
+PRIVATE_JOURNAL_MAXLEN = 2000
+PRIVATE_DIARY_MAXLEN = 500
+# Default prompts directory, resolved once at import
+_PROMPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts")
+
+# == Precompiled regexes used by the JSON extraction helpers ==
+_RE_NEWLINE_KEY = re.compile(r'\n\s+"(\w+)"\s*:')
+_RE_TRAILING_COMMA_OBJ = re.compile(r',\s*}')
+_RE_TRAILING_COMMA_ARR = re.compile(r',\s*]')
+_RE_SINGLE_QUOTE_KEY = re.compile(r"'(\w+)'\s*:")
+_RE_LINE_COMMENT = re.compile(r'//.*$', re.MULTILINE)
+_RE_BLOCK_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+_RE_UNESCAPED_QUOTE_VALUE = re.compile(r':\s*"([^"]*)"([^",}\]]+)"')
+# Keys that LLMs frequently emit with a stray newline/indent in front of them
+_PROBLEMATIC_KEYS = (
+    'negotiation_summary', 'relationship_updates', 'updated_relationships',
+    'order_summary', 'goals', 'relationships', 'intent'
+)
+_RE_PROBLEMATIC_KEY = re.compile(r'\n\s*"(' + '|'.join(map(re.escape, _PROBLEMATIC_KEYS)) + r')"')
+
+
+def _iter_json_spans(s: str) -> Iterator[tuple[int, int]]:
+    """
+    Yields (start, end) spans of balanced top-level {...} objects in a single
+    linear pass. Braces inside JSON strings (and escaped quotes) are ignored.
+    """
+    depth = 0
+    start = -1
+    in_string = False
+    escape = False
+    i = s.find('{')
+    n = len(s)
+    while i != -1 and i < n:
+        ch = s[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '{':
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                yield start, i + 1
+                # Skip prose between objects
+                i = s.find('{', i + 1)
+                continue
+        i += 1
+
+
+def _find_json_objects(s: str) -> list[str]:
+    return [s[start:end] for start, end in _iter_json_spans(s)]
+
+
+# Candidate finders, tried in order - most specific first. Each takes the text
+# and returns a list of candidate JSON strings.
+_JSON_CANDIDATE_FINDERS = tuple(
+    re.compile(p, re.DOTALL).findall if isinstance(p, str) else p
+    for p in (
+        # Special handling for ```{{ ... }}``` format that some models use
+        r"```\s*\{\{\s*(.*?)\s*\}\}\s*```",
+        # JSON in code blocks with or without language specifier
+        r"```(?:json)?\s*\n(.*?)\n\s*```",
+        # JSON after "PARSABLE OUTPUT:" or similar
+        r"PARSABLE OUTPUT:\s*(\{.*?\})",
+        r"JSON:\s*(\{.*?\})",
+        # Any JSON object (bracket-counting scan, any nesting depth)
+        _find_json_objects,
+        # Simple JSON in backticks
+        r"`(\{.*?\})`",
+    )
+)
+_RE_MARKDOWN_KV = re.compile(r"\*\*(?P<key>[^:]+):\*\*\s*(?P<value>[\s\S]*?)(?=(?:\n\s*\*\*|$))", re.DOTALL)
+_RE_NON_JSON_CHARS = re.compile(r'[^{}[\]"\',:.\d\w\s_-]')
+_RE_SINGLE_QUOTED_KEY = re.compile(r"'([^']*)':")
+_RE_SINGLE_QUOTED_VALUE = re.compile(r': *\'([^\']*)\'')
+
+# json5 is a pure-Python tokenizer and slow on multi-KB inputs; only use it as a
+# last resort on candidates below this size.
+JSON5_MAX_CHARS = 8192
+
+# The forgiving parsers are only needed for malformed responses, so they are
+# imported on first use rather than at module import.
+@cache
+def _get_json5():
+    import json5
+    return json5
+
+@cache
+def _get_json_repair():
+    import json_repair
+    return json_repair
+
+def _json5_loads(text: str):
+    return _get_json5().loads(text)
+
+def _json_repair_loads(text: str):
+    # json.loads has always been tried already by the time we get here
+    return _get_json_repair().loads(text, skip_json_loads=True)
+
+# Single-slot memo: every agent's state update in a phase receives the same
+# board_state dict, so the string is built once per phase, not once per power.
+_last_board_state_str: tuple[dict | None, str] = (None, "")
+
+def _state_update_board_str(board_state: dict) -> str:
+    global _last_board_state_str
+    cached_state, cached_str = _last_board_state_str
+    if cached_state is board_state:
+        return cached_str
+    lines = ["Board State:"]
+    for p_name, power_data in board_state.get('powers', {}).items():
+        # Get units and centers from the board state
+        units = power_data.get('units', [])
+        centers = power_data.get('centers', [])
+        lines.append(f"  {p_name}: Units={units}, Centers={centers}")
+    board_state_str = "\n".join(lines) + "\n"
+    _last_board_state_str = (board_state, board_state_str)
+    return board_state_str
+
+def order_relationships(relationships: dict[str, str]) -> dict[str, str]:
+    """Returns a copy of `relationships` keyed in POWER_ORDER (unknown keys last)."""
+    unknown = len(POWER_ORDER)
+    return dict(sorted(relationships.items(), key=lambda kv: POWER_IDX.get(kv[0], unknown)))
+
+
+def _first_valid(data: dict, keys: tuple[str, ...], predicate) -> tuple[str | None, object]:
+    """Returns (key, value) for the first of `keys` whose value satisfies `predicate`, else (None, None)."""
+    return next(((k, data[k]) for k in keys if predicate(data.get(k))), (None, None))
+
+# Key aliases accepted in state update responses (prompt uses the short names)
+_STATE_GOALS_KEYS = ('updated_goals', 'goals')
+_STATE_RELATIONSHIPS_KEYS = ('updated_relationships', 'relationships')
+
+def _is_list(v) -> bool:
+    return isinstance(v, list)
+
+def _is_dict(v) -> bool:
+    return isinstance(v, dict)
+
+def _is_not_none(v) -> bool:
+    return v is not None
+
+class _LazyStr:
+    """Defers building a prompt value until a template actually substitutes it."""
+    __slots__ = ("_build",)
+
+    def __init__(self, build):
+        self._build = build
+
+    def __str__(self) -> str:
+        return self._build()
+
+def _lazy_board_state_str(game: 'Game') -> _LazyStr:
+    def build() -> str:
+        board_state_dict = game.get_state()
+        return f"Units: {board_state_dict.get('units', {})}, Centers: {board_state_dict.get('centers', {})}"
+    return _LazyStr(build)
 
 # == New: Helper function to load prompt files reliably ==
 def _load_prompt_file(filename: str, prompts_dir: Optional[str] = None) -> Optional[str]:
-    """Loads a prompt template from the prompts directory."""
-    try:
-        if prompts_dir:
-            filepath = os.path.join(prompts_dir, filename)
-        else:
-            # Construct path relative to this file's location
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            default_prompts_dir = os.path.join(current_dir, 'prompts')
-            filepath = os.path.join(default_prompts_dir, filename)
-        
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return f.read()
-    except FileNotFoundError:
-        logger.error(f"Prompt file not found: {filepath}")
-        return None
-    except Exception as e:
-        logger.error(f"Error loading prompt file {filepath}: {e}")
-        return None
+    """Loads a prompt template from the prompts directory (cached per absolute path)."""
+    filepath = os.path.join(prompts_dir or _PROMPTS_DIR, filename)
+    return cached_read_text(os.path.abspath(filepath))
+
+@lru_cache(maxsize=16)
+def _load_prompt_template(filename: str, prompts_dir: str | None = None) -> Template | None:
+    """
+    Loads a `$placeholder`-style prompt template. Unlike str.format(), string.Template
+    leaves the JSON braces in the examples alone, so no escaping pass is needed.
+    """
+    content = _load_prompt_file(filename, prompts_dir=prompts_dir)
+    return Template(content) if content else None
 
 class DiplomacyAgent:
     """
@@ -77,36 +258,39 @@ class DiplomacyAgent:
         self.goals: List[str] = initial_goals if initial_goals is not None else [] 
         # Initialize relationships to Neutral if not provided
         if initial_relationships is None:
-            self.relationships: Dict[str, str] = {p: "Neutral" for p in ALL_POWERS if p != self.power_name}
+            self.relationships: dict[str, str] = {p: "Neutral" for p in POWER_ORDER if p != self.power_name}
         else:
-            self.relationships: Dict[str, str] = initial_relationships
-        self.private_journal: List[str] = []
+            self.relationships: dict[str, str] = order_relationships(initial_relationships)
+        self.private_journal: deque[str] = deque(maxlen=PRIVATE_JOURNAL_MAXLEN)
         
         # The permanent, unabridged record of all entries. This only ever grows.
         self.full_private_diary: List[str] = []
         
         # The version used for LLM context. This gets rebuilt by consolidation.
-        self.private_diary: List[str] = []
+        self.private_diary: deque[str] = deque(maxlen=PRIVATE_DIARY_MAXLEN)
+        # Bumped on every add_diary_entry; together with the identity of private_diary
+        # (which consolidation replaces) it keys the formatted-diary cache.
+        self._diary_version: int = 0
+        self._diary_prompt_cache: tuple[deque[str], int, str] | None = None
+        # Own (units, centers) as of the last state update; lets quiet retreat/build
+        # phases skip the LLM call.
+        self._last_state_update_sig: tuple[frozenset, frozenset] | None = None
 
         # --- Load and set the appropriate system prompt ---
-        # Get the directory containing the current file (agent.py)
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        # Construct path relative to the current file's directory
-        default_prompts_path = os.path.join(current_dir, "prompts") 
         power_prompt_filename = f"{power_name.lower()}_system_prompt.txt"
         default_prompt_filename = "system_prompt.txt"
 
         # Use the provided prompts_dir if available, otherwise use the default
-        prompts_path_to_use = self.prompts_dir if self.prompts_dir else default_prompts_path
+        prompts_path_to_use = self.prompts_dir if self.prompts_dir else _PROMPTS_DIR
         
         power_prompt_filepath = os.path.join(prompts_path_to_use, power_prompt_filename)
         default_prompt_filepath = os.path.join(prompts_path_to_use, default_prompt_filename)
 
-        system_prompt_content = load_prompt(power_prompt_filepath, prompts_dir=self.prompts_dir)
+        system_prompt_content = (cached_read_text(os.path.abspath(power_prompt_filepath)) or "").strip()
 
         if not system_prompt_content:
             logger.warning(f"Power-specific prompt '{power_prompt_filepath}' not found or empty. Loading default system prompt.")
-            system_prompt_content = load_prompt(default_prompt_filepath, prompts_dir=self.prompts_dir)
+            system_prompt_content = (cached_read_text(os.path.abspath(default_prompt_filepath)) or "").strip()
         else:
              logger.info(f"Loaded power-specific system prompt for {power_name}.")
         # ----------------------------------------------------
@@ -123,102 +307,81 @@ class DiplomacyAgent:
         if not text or not text.strip():
             logger.warning(f"[{self.power_name}] Empty text provided to JSON extractor")
             return {}
+
+        # Pure prose: nothing any of the strategies below could turn into a dict
+        # (they all need a brace, except the **key:** markdown parser).
+        if '{' not in text and '**' not in text:
+            logger.warning(f"[{self.power_name}] No JSON object or markdown key-value pairs in response. Text: {text[:200]}")
+            return {}
             
         # Store original text for debugging
         original_text = text
-        
+
+        # Fast path: most responses are clean JSON (optionally fenced), so try a
+        # direct parse before any regex preprocessing.
+        stripped = text.strip()
+        if stripped.startswith("```"):
+            first_newline = stripped.find("\n")
+            closing_fence = stripped.rfind("```")
+            if first_newline != -1 and closing_fence > first_newline:
+                stripped = stripped[first_newline + 1:closing_fence].strip()
+        try:
+            result = _fast_json_loads(stripped)
+            if isinstance(result, dict):
+                logger.debug(f"[{self.power_name}] Parsed JSON object on fast path")
+                return result
+        except ValueError:
+            start = stripped.find('{')
+            end = stripped.rfind('}') + 1
+            if start != -1 and end > start:
+                try:
+                    result = _fast_json_loads(stripped[start:end])
+                    if isinstance(result, dict):
+                        logger.debug(f"[{self.power_name}] Parsed JSON object on fast path (trimmed)")
+                        return result
+                except ValueError:
+                    pass
+
         # Preprocessing: Normalize common formatting issues
-        # This helps with the KeyError: '\n  "negotiation_summary"' problem
-        text = re.sub(r'\n\s+"(\w+)"\s*:', r'"\1":', text)  # Remove newlines before keys
-        # Fix specific patterns that cause trouble
-        problematic_patterns = [
-            'negotiation_summary', 'relationship_updates', 'updated_relationships',
-            'order_summary', 'goals', 'relationships', 'intent'
-        ]
-        for pattern in problematic_patterns:
-            text = re.sub(fr'\n\s*"{pattern}"', f'"{pattern}"', text)
-        
-        # Try different patterns to extract JSON
-        # Order matters - try most specific patterns first
-        patterns = [
-            # Special handling for ```{{ ... }}``` format that some models use
-            r"```\s*\{\{\s*(.*?)\s*\}\}\s*```",
-            # JSON in code blocks with or without language specifier
-            r"```(?:json)?\s*\n(.*?)\n\s*```",
-            # JSON after "PARSABLE OUTPUT:" or similar
-            r"PARSABLE OUTPUT:\s*(\{.*?\})",
-            r"JSON:\s*(\{.*?\})",
-            # Any JSON object
-            r"(\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\})",
-            # Simple JSON in backticks
-            r"`(\{.*?\})`",
-        ]
+        # This helps with the KeyError: '\n  "negotiation_summary"' problem.
+        # Bare (or fenced) objects skip it and go straight to _clean_json_text,
+        # which already fixes newline-prefixed keys.
+        if not (stripped.startswith('{') and stripped.endswith('}')):
+            text = _RE_NEWLINE_KEY.sub(r'"\1":', text)  # Remove newlines before keys
+            # Fix specific patterns that cause trouble (single pass over the text)
+            text = _RE_PROBLEMATIC_KEY.sub(r'"\1"', text)
         
-        # Try each pattern
-        for pattern_idx, pattern in enumerate(patterns):
-            matches = re.findall(pattern, text, re.DOTALL)
+        # Clean the whole text once instead of re-cleaning every candidate match
+        cleaned_text = self._clean_json_text(text)
+        try:
+            result = _fast_json_loads(cleaned_text)
+            if isinstance(result, dict):
+                logger.debug(f"[{self.power_name}] Parsed JSON object after cleaning")
+                return result
+        except ValueError:
+            pass
+
+        # Try each candidate finder (see _JSON_CANDIDATE_FINDERS for ordering)
+        for pattern_idx, find_candidates in enumerate(_JSON_CANDIDATE_FINDERS):
+            matches = find_candidates(cleaned_text)
             if matches:
                 for match_idx, match in enumerate(matches):
-                    # Multiple attempts with different parsers
                     json_text = match.strip()
-                    
-                    # Attempt 1: Standard JSON after basic cleaning
+
+                    # Attempt 1: Standard JSON
                     try:
-                        cleaned = self._clean_json_text(json_text)
-                        result = json.loads(cleaned)
+                        result = _fast_json_loads(json_text)
                         if isinstance(result, dict):
                             logger.debug(f"[{self.power_name}] Successfully parsed JSON object with pattern {pattern_idx}, match {match_idx}")
                             return result
                         else:
                             logger.warning(f"[{self.power_name}] Parsed JSON with pattern {pattern_idx}, match {match_idx}, but got type {type(result)} instead of dict. Content: {str(result)[:200]}")
-                    except json.JSONDecodeError as e_initial:
+                    except ValueError as e_initial:
                         logger.debug(f"[{self.power_name}] Standard JSON parse failed: {e_initial}")
-                        
-                        # Attempt 1.5: Try surgical cleaning with original patterns if basic cleaning failed
-                        try:
-                            # Apply several different cleaning patterns from the old method
-                            cleaned_match_candidate = json_text
-                            
-                            # Pattern 1: Removes 'Sentence.' when followed by ',', '}', or ']'
-                            cleaned_match_candidate = re.sub(r'\s*([A-Z][\w\s,]*?\.(?:\s+[A-Z][\w\s,]*?\.)*)\s*(?=[,\}\]])', '', cleaned_match_candidate)
-                            
-                            # Pattern 2: Removes 'Sentence.' when it's at the very end, before the final '}' of the current scope
-                            cleaned_match_candidate = re.sub(r'\s*([A-Z][\w\s,]*?\.(?:\s+[A-Z][\w\s,]*?\.)*)\s*(?=\s*\}\s*$)', '', cleaned_match_candidate)
-                            
-                            # Pattern 3: Fix for newlines and spaces before JSON keys (common problem with LLMs)
-                            cleaned_match_candidate = re.sub(r'\n\s+"(\w+)"\s*:', r'"\1":', cleaned_match_candidate)
-                            
-                            # Pattern 4: Fix trailing commas in JSON objects
-                            cleaned_match_candidate = re.sub(r',\s*}', '}', cleaned_match_candidate)
-                            
-                            # Pattern 5: Handle specific known problematic patterns
-                            for pattern in problematic_patterns:
-                                cleaned_match_candidate = cleaned_match_candidate.replace(f'\n  "{pattern}"', f'"{pattern}"')
-                            
-                            # Pattern 6: Fix quotes - replace single quotes with double quotes for keys
-                            cleaned_match_candidate = re.sub(r"'(\w+)'\s*:", r'"\1":', cleaned_match_candidate)
-
-                            # Only try parsing if cleaning actually changed something
-                            if cleaned_match_candidate != json_text:
-                                logger.debug(f"[{self.power_name}] Surgical cleaning applied. Attempting to parse modified JSON.")
-                                return json.loads(cleaned_match_candidate)
-                        except json.JSONDecodeError as e_surgical:
-                            logger.debug(f"[{self.power_name}] Surgical cleaning didn't work: {e_surgical}")
-                    
-                    # Attempt 2: json5 (more forgiving)
-                    try:
-                        result = json5.loads(json_text)
-                        if isinstance(result, dict):
-                            logger.debug(f"[{self.power_name}] Successfully parsed JSON object with json5")
-                            return result
-                        else:
-                            logger.warning(f"[{self.power_name}] Parsed with json5, but got type {type(result)} instead of dict. Content: {str(result)[:200]}")
-                    except Exception as e:
-                        logger.debug(f"[{self.power_name}] json5 parse failed: {e}")
-                    
-                    # Attempt 3: json-repair
+
+                    # Attempt 2: json-repair (we already tried json.loads above)
                     try:
-                        result = json_repair.loads(json_text)
+                        result = _json_repair_loads(json_text)
                         if isinstance(result, dict):
                             logger.debug(f"[{self.power_name}] Successfully parsed JSON object with json-repair")
                             return result
@@ -226,7 +389,7 @@ class DiplomacyAgent:
                             logger.warning(f"[{self.power_name}] Parsed with json-repair, but got type {type(result)} instead of dict. Content: {str(result)[:200]}")
                     except Exception as e:
                         logger.debug(f"[{self.power_name}] json-repair failed: {e}")
-        
+
         # New Strategy: Parse markdown-like key-value pairs
         # Example: **key:** value
         # This comes after trying to find fenced JSON blocks but before broad fallbacks.
@@ -234,8 +397,7 @@ class DiplomacyAgent:
             try:
                 markdown_data = {}
                 # Regex to find **key:** value, where value can be multi-line until next **key:** or end of string
-                md_pattern = r"\*\*(?P<key>[^:]+):\*\*\s*(?P<value>[\s\S]*?)(?=(?:\n\s*\*\*|$))"
-                for match in re.finditer(md_pattern, text, re.DOTALL):
+                for match in _RE_MARKDOWN_KV.finditer(text):
                     key_name = match.group('key').strip()
                     value_str = match.group('value').strip()
                     try:
@@ -248,12 +410,12 @@ class DiplomacyAgent:
                         # Or it could be genuinely malformed. We'll take it as a string if it's not empty.
                         if value_str: # Only add if it's a non-empty string
                             markdown_data[key_name] = value_str # Store as string
-                        logger.debug(f"[{self.power_name}] ast.literal_eval failed for key '{key_name}', value '{value_str[:50]}...': {e_ast}. Storing as string if non-empty.")
+                        logger.debug("[%s] ast.literal_eval failed for key '%s', value '%.50s...': %s. Storing as string if non-empty.", self.power_name, key_name, value_str, e_ast)
                 
                 if markdown_data: # If we successfully extracted any key-value pairs this way
                     # Check if essential keys are present, if needed, or just return if any data found
                     # For now, if markdown_data is populated, we assume it's the intended structure.
-                    logger.debug(f"[{self.power_name}] Successfully parsed markdown-like key-value format. Data: {str(markdown_data)[:200]}")
+                    logger.debug("[%s] Successfully parsed markdown-like key-value format. Data: %.200s", self.power_name, markdown_data)
                     return markdown_data
                 else:
                     logger.debug(f"[{self.power_name}] No markdown-like key-value pairs found or parsed using markdown strategy.")
@@ -270,10 +432,12 @@ class DiplomacyAgent:
                 
                 # Try all parsers on this extracted text
                 for parser_name, parser_func in [
-                    ("json", json.loads),
-                    ("json5", json5.loads),
-                    ("json_repair", json_repair.loads)
+                    ("json", _fast_json_loads),
+                    ("json_repair", _json_repair_loads),
+                    ("json5", _json5_loads),
                 ]:
+                    if parser_name == "json5" and len(potential_json) >= JSON5_MAX_CHARS:
+                        continue
                     try:
                         cleaned = self._clean_json_text(potential_json) if parser_name == "json" else potential_json
                         result = parser_func(cleaned)
@@ -288,18 +452,18 @@ class DiplomacyAgent:
                 # If standard parsers failed, try aggressive cleaning
                 try:
                     # Remove common non-JSON text that LLMs might add
-                    cleaned_text = re.sub(r'[^{}[\]"\',:.\d\w\s_-]', '', potential_json)
+                    cleaned_text = _RE_NON_JSON_CHARS.sub('', potential_json)
                     # Replace single quotes with double quotes (common LLM error)
-                    text_fixed = re.sub(r"'([^']*)':", r'"\1":', cleaned_text)
-                    text_fixed = re.sub(r': *\'([^\']*)\'', r': "\1"', text_fixed)
+                    text_fixed = _RE_SINGLE_QUOTED_KEY.sub(r'"\1":', cleaned_text)
+                    text_fixed = _RE_SINGLE_QUOTED_VALUE.sub(r': "\1"', text_fixed)
                     
-                    result = json.loads(text_fixed)
+                    result = _fast_json_loads(text_fixed)
                     if isinstance(result, dict):
                         logger.debug(f"[{self.power_name}] Aggressive cleaning worked, got dict.")
                         return result
                     else:
                         logger.warning(f"[{self.power_name}] Aggressive cleaning worked, but got type {type(result)} instead of dict. Content: {str(result)[:200]}")
-                except json.JSONDecodeError:
+                except ValueError:
                     pass
                     
         except Exception as e:
@@ -307,7 +471,7 @@ class DiplomacyAgent:
         
         # Last resort: Try json-repair on the entire text
         try:
-            result = json_repair.loads(text)
+            result = _json_repair_loads(text)
             if isinstance(result, dict):
                 logger.warning(f"[{self.power_name}] Last resort json-repair succeeded, got dict.")
                 return result
@@ -325,22 +489,22 @@ class DiplomacyAgent:
             return text
             
         # Remove trailing commas
-        text = re.sub(r',\s*}', '}', text)
-        text = re.sub(r',\s*]', ']', text)
+        text = _RE_TRAILING_COMMA_OBJ.sub('}', text)
+        text = _RE_TRAILING_COMMA_ARR.sub(']', text)
         
         # Fix newlines before JSON keys
-        text = re.sub(r'\n\s+"(\w+)"\s*:', r'"\1":', text)
+        text = _RE_NEWLINE_KEY.sub(r'"\1":', text)
         
         # Replace single quotes with double quotes for keys
-        text = re.sub(r"'(\w+)'\s*:", r'"\1":', text)
+        text = _RE_SINGLE_QUOTE_KEY.sub(r'"\1":', text)
         
         # Remove comments (if any)
-        text = re.sub(r'//.*$', '', text, flags=re.MULTILINE)
-        text = re.sub(r'/\*.*?\*/', '', text, flags=re.DOTALL)
+        text = _RE_LINE_COMMENT.sub('', text)
+        text = _RE_BLOCK_COMMENT.sub('', text)
         
         # Fix unescaped quotes in values (basic attempt)
         # This is risky but sometimes helps with simple cases
-        text = re.sub(r':\s*"([^"]*)"([^",}\]]+)"', r': "\1\2"', text)
+        text = _RE_UNESCAPED_QUOTE_VALUE.sub(r': "\1\2"', text)
         
         # Remove any BOM or zero-width spaces
         text = text.replace('\ufeff', '').replace('\u200b', '')
@@ -354,7 +518,7 @@ class DiplomacyAgent:
         if not isinstance(entry, str):
             entry = str(entry)
         self.private_journal.append(entry)
-        logger.debug(f"[{self.power_name} Journal]: {entry}")
+        logger.debug("[%s Journal]: %s", self.power_name, entry)
 
     def add_diary_entry(self, entry: str, phase: str):
         """Adds a formatted entry to both the permanent and context diaries."""
@@ -364,8 +528,14 @@ class DiplomacyAgent:
         
         # Add to the permanent, unabridged record
         self.full_private_diary.append(formatted_entry)
-        # Also add to the context diary, which will be periodically rebuilt
-        self.private_diary.append(formatted_entry)
+        # Also add to the context diary, which will be periodically rebuilt.
+        # A full deque would evict from the left, so make room by dropping the oldest
+        # recent entry instead of the consolidated summary at index 0.
+        diary = self.private_diary
+        if len(diary) == diary.maxlen and diary[0].startswith("[CONSOLIDATED HISTORY]"):
+            del diary[1]
+        diary.append(formatted_entry)
+        self._diary_version += 1
 
         logger.info(f"[{self.power_name}] DIARY ENTRY ADDED for {phase}. Total full entries: {len(self.full_private_diary)}. New entry: {entry[:100]}...")
 
@@ -374,6 +544,10 @@ class DiplomacyAgent:
         Formats the context diary for inclusion in a prompt.
         It separates the single consolidated history entry from all recent full entries.
         """
+        cache = self._diary_prompt_cache
+        if cache is not None and cache[0] is self.private_diary and cache[1] == self._diary_version:
+            return cache[2]
+
         logger.info(f"[{self.power_name}] Formatting diary for prompt. Total context entries: {len(self.private_diary)}")
         if not self.private_diary:
             logger.warning(f"[{self.power_name}] No diary entries found when formatting for prompt")
@@ -387,11 +561,13 @@ class DiplomacyAgent:
         # Find the single consolidated entry, which should be the first one if it exists.
         if self.private_diary and self.private_diary[0].startswith("[CONSOLIDATED HISTORY]"):
             consolidated_entry = self.private_diary[0]
-            # Get all other entries, which are the full, unconsolidated ones.
-            recent_entries = self.private_diary[1:]
+            # Get all other entries, which are the full, unconsolidated ones (no slice copy).
+            recent_entries = islice(self.private_diary, 1, None)
+            recent_count = len(self.private_diary) - 1
         else:
             # No consolidated entry found, so all entries are "recent".
             recent_entries = self.private_diary
+            recent_count = len(self.private_diary)
 
         # Combine them into a formatted string
         formatted_diary = ""
@@ -400,15 +576,15 @@ class DiplomacyAgent:
             formatted_diary += consolidated_entry
             formatted_diary += "\n\n"
         
-        if recent_entries:
+        if recent_count:
             formatted_diary += "--- RECENT FULL DIARY ENTRIES ---\n"
-            # Use join on the full list of recent entries, not a slice.
             formatted_diary += "\n\n".join(recent_entries)
         
         if not formatted_diary:
             return "(No diary entries to show)"
 
-        logger.info(f"[{self.power_name}] Formatted diary with {1 if consolidated_entry else 0} consolidated and {len(recent_entries)} recent entries. Preview: {formatted_diary[:250]}...")
+        logger.info(f"[{self.power_name}] Formatted diary with {1 if consolidated_entry else 0} consolidated and {recent_count} recent entries. Preview: {formatted_diary[:250]}...")
+        self._diary_prompt_cache = (self.private_diary, self._diary_version, formatted_diary)
         return formatted_diary
     
     # The consolidate_entire_diary method has been moved to ai_diplomacy/diary_logic.py
@@ -420,23 +596,22 @@ class DiplomacyAgent:
         Generates a diary entry summarizing negotiations and updates relationships.
         This method now includes comprehensive LLM interaction logging.
         """
-        logger.info(f"[{self.power_name}] Generating negotiation diary entry for {game.current_short_phase}..." )
+        logger.debug(f"[{self.power_name}] Generating negotiation diary entry for {game.current_short_phase}..." )
         
         full_prompt = ""  # For logging in finally block
         raw_response = "" # For logging in finally block
         success_status = "Failure: Initialized" # Default
 
         try:
-            # Load the template file but safely preprocess it first
-            prompt_template_content = _load_prompt_file('negotiation_diary_prompt.txt', prompts_dir=self.prompts_dir)
-            if not prompt_template_content:
+            prompt_template = _load_prompt_template('negotiation_diary_prompt.txt', prompts_dir=self.prompts_dir)
+            if not prompt_template:
                 logger.error(f"[{self.power_name}] Could not load negotiation_diary_prompt.txt. Skipping diary entry.")
                 success_status = "Failure: Prompt file not loaded"
                 return # Exit early if prompt can't be loaded
 
-            # Prepare context for the prompt
-            board_state_dict = game.get_state()
-            board_state_str = f"Units: {board_state_dict.get('units', {})}, Centers: {board_state_dict.get('centers', {})}"
+            # Prepare context for the prompt. The larger values are built only if
+            # the template references them (see _LazyStr).
+            board_state_str = _lazy_board_state_str(game)
             
             messages_this_round = game_history.get_messages_this_round(
                 power_name=self.power_name,
@@ -445,47 +620,22 @@ class DiplomacyAgent:
             if not messages_this_round.strip() or messages_this_round.startswith("\n(No messages"):
                 messages_this_round = "(No messages involving your power this round that require deep reflection for diary. Focus on overall situation.)"
             
-            current_relationships_str = json.dumps(self.relationships)
-            current_goals_str = json.dumps(self.goals)
-            formatted_diary = self.format_private_diary_for_prompt()
+            current_relationships_str = _LazyStr(lambda: _fast_json_dumps(self.relationships))
+            current_goals_str = _fast_json_dumps(self.goals)
+            formatted_diary = _LazyStr(self.format_private_diary_for_prompt)
             
             # Get ignored messages context
             ignored_messages = game_history.get_ignored_messages_by_power(self.power_name)
-            ignored_context = ""
             if ignored_messages:
-                ignored_context = "\n\nPOWERS NOT RESPONDING TO YOUR MESSAGES:\n"
+                ignored_lines = ["\n\nPOWERS NOT RESPONDING TO YOUR MESSAGES:"]
                 for power, msgs in ignored_messages.items():
-                    ignored_context += f"{power}:\n"
-                    for msg in msgs[-2:]:  # Show last 2 ignored messages per power
-                        ignored_context += f"  - Phase {msg['phase']}: {msg['content'][:100]}...\n"
+                    ignored_lines.append(f"{power}:")
+                    # Show last 2 ignored messages per power
+                    ignored_lines.extend(f"  - Phase {msg['phase']}: {msg['content'][:100]}..." for msg in msgs[-2:])
+                ignored_context = "\n".join(ignored_lines) + "\n"
             else:
                 ignored_context = "\n\nAll powers have been responsive to your messages."
             
-            # Do aggressive preprocessing of the template to fix the problematic patterns
-            # This includes removing any newlines or whitespace before JSON keys that cause issues
-            for pattern in ['negotiation_summary', 'updated_relationships', 'relationship_updates', 'intent']:
-                # Fix the "\n  "key"" pattern that breaks .format()
-                prompt_template_content = re.sub(
-                    fr'\n\s*"{pattern}"', 
-                    f'"{pattern}"', 
-                    prompt_template_content
-                )
-            
-            # Escape all curly braces in JSON examples to prevent format() from interpreting them
-            # First, temporarily replace the actual template variables
-            temp_vars = ['power_name', 'current_phase', 'messages_this_round', 'agent_goals', 
-                        'agent_relationships', 'board_state_str', 'ignored_messages_context']
-            for var in temp_vars:
-                prompt_template_content = prompt_template_content.replace(f'{{{var}}}', f'<<{var}>>')
-            
-            # Now escape all remaining braces (which should be JSON)
-            prompt_template_content = prompt_template_content.replace('{', '{{')
-            prompt_template_content = prompt_template_content.replace('}', '}}')
-            
-            # Restore the template variables
-            for var in temp_vars:
-                prompt_template_content = prompt_template_content.replace(f'<<{var}>>', f'{{{var}}}')
-            
             # Create a dictionary with safe values for formatting
             format_vars = {
                 "power_name": self.power_name,
@@ -499,21 +649,12 @@ class DiplomacyAgent:
                 "ignored_messages_context": ignored_context
             }
             
-            # Now try to use the template after preprocessing
-            try:
-                # Apply format with our set of variables
-                full_prompt = prompt_template_content.format(**format_vars)
-                logger.info(f"[{self.power_name}] Successfully formatted prompt template after preprocessing.")
-                success_status = "Using prompt file with preprocessing"                
-            except KeyError as e:
-                logger.error(f"[{self.power_name}] Error formatting negotiation diary prompt template: {e}. Skipping diary entry.")
-                success_status = "Failure: Template formatting error"
-                return  # Exit early if prompt formatting fails
+            # safe_substitute never raises on the literal JSON in the examples
+            full_prompt = prompt_template.safe_substitute(format_vars)
+            logger.debug(f"[{self.power_name}] Successfully formatted negotiation diary prompt template.")
+            success_status = "Using prompt file"
             
-            logger.debug(f"[{self.power_name}] Negotiation diary prompt:\n{full_prompt[:500]}...")
-
-
-            logger.debug(f"[{self.power_name}] Negotiation diary prompt:\n{full_prompt[:500]}...")
+            logger.debug("[%s] Negotiation diary prompt:\n%.500s...", self.power_name, full_prompt)
 
             raw_response = await run_llm_and_log(
                 client=self.client,
@@ -522,14 +663,15 @@ class DiplomacyAgent:
                 power_name=self.power_name,
                 phase=game.current_short_phase,
                 response_type='negotiation_diary_raw', # For run_llm_and_log context
+                json_mode=True, # Structured output where supported; parsed via the fast path
             )
 
-            logger.debug(f"[{self.power_name}] Raw negotiation diary response: {raw_response[:300]}...")
+            logger.debug("[%s] Raw negotiation diary response: %.300s...", self.power_name, raw_response)
 
             parsed_data = None
             try:
                 parsed_data = self._extract_json_from_text(raw_response)
-                logger.debug(f"[{self.power_name}] Parsed diary data: {parsed_data}")
+                logger.debug("[%s] Parsed diary data: %s", self.power_name, parsed_data)
                 success_status = "Success: Parsed diary data"
             except json.JSONDecodeError as e:
                 logger.error(f"[{self.power_name}] Failed to parse JSON from diary response: {e}. Response: {raw_response[:300]}...")
@@ -541,36 +683,35 @@ class DiplomacyAgent:
 
             if parsed_data:
                 # Fix 1: Be more robust about extracting the negotiation_summary field
-                diary_text_candidate = None
-                for key in ['negotiation_summary', 'summary', 'diary_entry']:
-                    if key in parsed_data and isinstance(parsed_data[key], str) and parsed_data[key].strip():
-                        diary_text_candidate = parsed_data[key].strip()
-                        logger.info(f"[{self.power_name}] Successfully extracted '{key}' for diary.")
-                        break
-                        
+                key, diary_text_candidate = _first_valid(
+                    parsed_data, ('negotiation_summary', 'summary', 'diary_entry'),
+                    lambda v: isinstance(v, str) and v.strip(),
+                )
                 if diary_text_candidate:
-                    diary_entry_text = diary_text_candidate
+                    logger.debug(f"[{self.power_name}] Successfully extracted '{key}' for diary.")
+                    diary_entry_text = diary_text_candidate.strip()
                 else:
                     logger.warning(f"[{self.power_name}] Could not find valid summary field in diary response. Using fallback.")
                     # Keep the default fallback text
                 
                 # Fix 2: Be more robust about extracting relationship updates
-                new_relationships = None
-                for key in ['relationship_updates', 'updated_relationships', 'relationships']:
-                    if key in parsed_data and isinstance(parsed_data[key], dict):
-                        new_relationships = parsed_data[key]
-                        logger.info(f"[{self.power_name}] Successfully extracted '{key}' for relationship updates.")
-                        break
-                        
+                key, new_relationships = _first_valid(
+                    parsed_data, ('relationship_updates', 'updated_relationships', 'relationships'),
+                    lambda v: isinstance(v, dict),
+                )
+                if new_relationships is not None:
+                    logger.debug(f"[{self.power_name}] Successfully extracted '{key}' for relationship updates.")
+
                 if isinstance(new_relationships, dict):
-                    valid_new_rels = {}
-                    for p, r in new_relationships.items():
-                        p_upper = str(p).upper()
-                        r_title = str(r).title()
-                        if p_upper in ALL_POWERS and p_upper != self.power_name and r_title in ALLOWED_RELATIONSHIPS:
-                            valid_new_rels[p_upper] = r_title
-                        elif p_upper != self.power_name: # Log invalid relationship for a valid power
-                            logger.warning(f"[{self.power_name}] Invalid relationship '{r}' for power '{p}' in diary update. Keeping old.")
+                    candidates = {str(p).upper(): str(r).title() for p, r in new_relationships.items()}
+                    candidates.pop(self.power_name, None)
+                    valid_new_rels = {
+                        p: r for p, r in candidates.items()
+                        if p in ALL_POWERS and r in ALLOWED_RELATIONSHIPS_SET
+                    }
+                    if len(valid_new_rels) != len(candidates):
+                        invalid_rels = {p: r for p, r in candidates.items() if p not in valid_new_rels}
+                        logger.warning(f"[{self.power_name}] Invalid relationship updates in diary response: {invalid_rels}. Keeping old.")
                     
                     if valid_new_rels:
                         # Log changes before applying
@@ -582,7 +723,7 @@ class DiplomacyAgent:
                         relationships_updated = True
                         success_status = "Success: Applied diary data (relationships updated)"
                     else:
-                        logger.info(f"[{self.power_name}] No valid relationship updates found in diary response.")
+                        logger.debug(f"[{self.power_name}] No valid relationship updates found in diary response.")
                         if success_status == "Success: Parsed diary data": # If only parsing was successful before
                              success_status = "Success: Parsed, no valid relationship updates"
                 elif new_relationships is not None: # It was provided but not a dict
@@ -596,6 +737,7 @@ class DiplomacyAgent:
             # If success_status is still the default 'Parsed diary data' but no relationships were updated, refine it.
             if success_status == "Success: Parsed diary data" and not relationships_updated:
                 success_status = "Success: Parsed, only diary text applied"
+            logger.info(f"[{self.power_name}] Negotiation diary for {game.current_short_phase} done: {success_status}")
 
         except Exception as e:
             # Log the full exception details for better debugging
@@ -620,42 +762,20 @@ class DiplomacyAgent:
         """
         Generates a diary entry reflecting on the decided orders.
         """
-        logger.info(f"[{self.power_name}] Generating order diary entry for {game.current_short_phase}...")
+        logger.debug(f"[{self.power_name}] Generating order diary entry for {game.current_short_phase}...")
         
-        # Load the template but we'll use it carefully with string interpolation
-        prompt_template = _load_prompt_file('order_diary_prompt.txt', prompts_dir=self.prompts_dir)
+        prompt_template = _load_prompt_template('order_diary_prompt.txt', prompts_dir=self.prompts_dir)
         if not prompt_template:
             logger.error(f"[{self.power_name}] Could not load order_diary_prompt.txt. Skipping diary entry.")
             return
 
-        board_state_dict = game.get_state()
-        board_state_str = f"Units: {board_state_dict.get('units', {})}, Centers: {board_state_dict.get('centers', {})}"
+        board_state_str = _lazy_board_state_str(game)
         
         orders_list_str = "\n".join([f"- {o}" for o in orders]) if orders else "No orders submitted."
         
         goals_str = "\n".join([f"- {g}" for g in self.goals]) if self.goals else "None"
         relationships_str = "\n".join([f"- {p}: {s}" for p, s in self.relationships.items()]) if self.relationships else "None"
 
-        # Do aggressive preprocessing on the template file
-        # Fix any whitespace or formatting issues that could break .format()
-        for pattern in ['order_summary']:
-            prompt_template = re.sub(fr'\n\s*"{pattern}"', f'"{pattern}"', prompt_template)
-        
-        # Escape all curly braces in JSON examples to prevent format() from interpreting them
-        # First, temporarily replace the actual template variables
-        temp_vars = ['power_name', 'current_phase', 'orders_list_str', 'board_state_str', 
-                    'agent_goals', 'agent_relationships']
-        for var in temp_vars:
-            prompt_template = prompt_template.replace(f'{{{var}}}', f'<<{var}>>')
-        
-        # Now escape all remaining braces (which should be JSON)
-        prompt_template = prompt_template.replace('{', '{{')
-        prompt_template = prompt_template.replace('}', '}}')
-        
-        # Restore the template variables
-        for var in temp_vars:
-            prompt_template = prompt_template.replace(f'<<{var}>>', f'{{{var}}}')
-        
         # Create a dictionary of variables for template formatting
         format_vars = {
             "power_name": self.power_name,
@@ -666,15 +786,10 @@ class DiplomacyAgent:
             "agent_relationships": relationships_str
         }
         
-        # Try to use the template with proper formatting
-        try:
-            prompt = prompt_template.format(**format_vars)
-            logger.info(f"[{self.power_name}] Successfully formatted order diary prompt template.")
-        except KeyError as e:
-            logger.error(f"[{self.power_name}] Error formatting order diary template: {e}. Skipping diary entry.")
-            return  # Exit early if prompt formatting fails
+        prompt = prompt_template.safe_substitute(format_vars)
+        logger.debug(f"[{self.power_name}] Successfully formatted order diary prompt template.")
         
-        logger.debug(f"[{self.power_name}] Order diary prompt:\n{prompt[:300]}...")
+        logger.debug("[%s] Order diary prompt:\n%.300s...", self.power_name, prompt)
 
 
         
@@ -703,7 +818,7 @@ class DiplomacyAgent:
                         if isinstance(diary_text_candidate, str) and diary_text_candidate.strip():
                             actual_diary_text = diary_text_candidate
                             success_status = "TRUE"
-                            logger.info(f"[{self.power_name}] Successfully extracted 'order_summary' for order diary entry.")
+                            logger.debug(f"[{self.power_name}] Successfully extracted 'order_summary' for order diary entry.")
                         else:
                             logger.warning(f"[{self.power_name}] 'order_summary' missing, invalid, or empty. Value was: {diary_text_candidate}")
                             success_status = "FALSE" # Explicitly set false if not found or invalid
@@ -765,32 +880,35 @@ class DiplomacyAgent:
         Generates a diary entry analyzing the actual phase results,
         comparing them to negotiations and identifying betrayals/collaborations.
         """
-        logger.info(f"[{self.power_name}] Generating phase result diary entry for {game.current_short_phase}...")
+        logger.debug(f"[{self.power_name}] Generating phase result diary entry for {game.current_short_phase}...")
         
         # Load the template
-        prompt_template = _load_prompt_file('phase_result_diary_prompt.txt', prompts_dir=self.prompts_dir)
+        prompt_template = _load_prompt_template('phase_result_diary_prompt.txt', prompts_dir=self.prompts_dir)
         if not prompt_template:
             logger.error(f"[{self.power_name}] Could not load phase_result_diary_prompt.txt. Skipping diary entry.")
             return
         
         # Format all orders for the prompt
-        all_orders_formatted = ""
-        for power, orders in all_orders.items():
-            orders_str = ", ".join(orders) if orders else "No orders"
-            all_orders_formatted += f"{power}: {orders_str}\n"
+        all_orders_formatted = "".join(
+            f"{power}: {', '.join(orders) if orders else 'No orders'}\n"
+            for power, orders in all_orders.items()
+        )
         
         # Get your own orders
         your_orders = all_orders.get(self.power_name, [])
         your_orders_str = ", ".join(your_orders) if your_orders else "No orders"
         
-        # Get recent negotiations for this phase
-        messages_this_phase = game_history.get_messages_by_phase(game.current_short_phase)
-        your_negotiations = ""
+        # Get the negotiations of the phase just adjudicated. This runs after
+        # game.process(), so game.current_short_phase already names the next phase;
+        # the completed phase is the latest one recorded in the history.
+        messages_this_phase = game_history.phases[-1].messages if game_history.phases else []
+        negotiation_lines = []
         for msg in messages_this_phase:
             if msg.sender == self.power_name:
-                your_negotiations += f"To {msg.recipient}: {msg.content}\n"
+                negotiation_lines.append(f"To {msg.recipient}: {msg.content}\n")
             elif msg.recipient == self.power_name:
-                your_negotiations += f"From {msg.sender}: {msg.content}\n"
+                negotiation_lines.append(f"From {msg.sender}: {msg.content}\n")
+        your_negotiations = "".join(negotiation_lines)
         
         if not your_negotiations:
             your_negotiations = "No negotiations this phase"
@@ -802,7 +920,7 @@ class DiplomacyAgent:
         goals_str = "\n".join([f"- {g}" for g in self.goals]) if self.goals else "None"
         
         # Create the prompt
-        prompt = prompt_template.format(
+        prompt = prompt_template.safe_substitute(
             power_name=self.power_name,
             current_phase=game.current_short_phase,
             phase_summary=phase_summary,
@@ -813,7 +931,7 @@ class DiplomacyAgent:
             your_actual_orders=your_orders_str
         )
         
-        logger.debug(f"[{self.power_name}] Phase result diary prompt:\n{prompt[:500]}...")
+        logger.debug("[%s] Phase result diary prompt:\n%.500s...", self.power_name, prompt)
         
         raw_response = ""
         success_status = "FALSE"
@@ -858,7 +976,7 @@ class DiplomacyAgent:
             )
 
     def log_state(self, prefix=""):
-        logger.debug(f"[{self.power_name}] {prefix} State: Goals={self.goals}, Relationships={self.relationships}")
+        logger.debug("[%s] %s State: Goals=%s, Relationships=%s", self.power_name, prefix, self.goals, self.relationships)
 
     # Make this method async
     async def analyze_phase_and_update_state(self, game: 'Game', board_state: dict, phase_summary: str, game_history: 'GameHistory', log_file_path: str):
@@ -889,35 +1007,22 @@ class DiplomacyAgent:
             if not last_phase_summary:
                 logger.warning(f"[{power_name}] No summary available for previous phase {last_phase_name}. Skipping state update.")
                 return
- 
-            # == Fix: Use board_state parameter ==
-            possible_orders = game.get_all_possible_orders()
-            
-            # Get formatted diary for context
-            formatted_diary = self.format_private_diary_for_prompt()
 
-            context = build_context_prompt(
-                game=game,
-                board_state=board_state, # Use provided board_state parameter
-                power_name=power_name,
-                possible_orders=possible_orders, # Pass possible_orders
-                game_history=game_history, # Pass game_history
-                agent_goals=self.goals,
-                agent_relationships=self.relationships,
-                agent_private_diary=formatted_diary, # Pass formatted diary
-                prompts_dir=self.prompts_dir,
+            # Retreat/adjustment phases carry no negotiation; if they left this power's
+            # units and centers untouched there is nothing new for the LLM to assess.
+            state_sig = (
+                frozenset(board_state.get("units", {}).get(power_name, ())),
+                frozenset(board_state.get("centers", {}).get(power_name, ())),
             )
-
+            if not last_phase_name.endswith("M") and state_sig == self._last_state_update_sig:
+                logger.info(f"[{power_name}] No change for {power_name} in {last_phase_name}; skipping state update.")
+                return
+ 
             # Add previous phase summary to the information provided to the LLM
             other_powers = [p for p in game.powers if p != power_name]
             
-            # Create a readable board state string from the board_state dict
-            board_state_str = f"Board State:\n"
-            for p_name, power_data in board_state.get('powers', {}).items():
-                # Get units and centers from the board state
-                units = power_data.get('units', [])
-                centers = power_data.get('centers', [])
-                board_state_str += f"  {p_name}: Units={units}, Centers={centers}\n"
+            # Readable board state string (identical for every power this phase)
+            board_state_str = _state_update_board_str(board_state)
             
             # Extract year from the phase name (e.g., "S1901M" -> "1901")
             current_year = last_phase_name[1:5] if len(last_phase_name) >= 5 else "unknown"
@@ -928,23 +1033,31 @@ class DiplomacyAgent:
                 current_phase=last_phase_name, # Analyze the phase that just ended
                 board_state_str=board_state_str,
                 phase_summary=last_phase_summary, # Use provided phase_summary
-                other_powers=str(other_powers), # Pass as string representation
+                # Deterministic serialization keeps the prompt stable for prompt/response caches
+                other_powers=json.dumps(sorted(other_powers)),
                 current_goals="\n".join([f"- {g}" for g in self.goals]) if self.goals else "None",
-                current_relationships=str(self.relationships) if self.relationships else "None"
+                current_relationships=json.dumps(self.relationships, sort_keys=True) if self.relationships else "None"
             )
-            logger.debug(f"[{power_name}] State update prompt:\n{prompt}")
-
-            # Use the client's raw generation capability - AWAIT the async call USING THE WRAPPER
-            
-            response = await run_llm_and_log(
-                client=self.client,
-                prompt=prompt,
-                log_file_path=log_file_path,
-                power_name=power_name,
-                phase=current_phase,
-                response_type='state_update',
-            )
-            logger.debug(f"[{power_name}] Raw LLM response for state update: {response}")
+            logger.debug("[%s] State update prompt:\n%s", power_name, prompt)
+
+            # Identical prompts (reruns, replays) can be served from the optional response
+            # cache (DIPLOMACY_LLM_CACHE=1); the prompt already encodes power and phase.
+            cache_key = llm_cache_key(self.client.model_name, prompt, namespace=f"state_update:{power_name}:{current_phase}")
+            response = await get_cached_llm_response(cache_key)
+            from_cache = response is not None
+            if from_cache:
+                logger.info(f"[{power_name}] Using cached state update response")
+            else:
+                # Use the client's raw generation capability - AWAIT the async call USING THE WRAPPER
+                response = await run_llm_and_log(
+                    client=self.client,
+                    prompt=prompt,
+                    log_file_path=log_file_path,
+                    power_name=power_name,
+                    phase=current_phase,
+                    response_type='state_update',
+                )
+            logger.debug("[%s] Raw LLM response for state update: %s", power_name, response)
 
             log_entry_response_type = 'state_update' # Default for log_llm_response
             log_entry_success = "FALSE" # Default
@@ -953,7 +1066,7 @@ class DiplomacyAgent:
             if response is not None and response.strip(): # Check if response is not None and not just whitespace
                 try:
                     update_data = self._extract_json_from_text(response)
-                    logger.debug(f"[{power_name}] Successfully parsed JSON: {update_data}")
+                    logger.debug("[%s] Successfully parsed JSON: %s", power_name, update_data)
                     
                     # Ensure update_data is a dictionary
                     if not isinstance(update_data, dict):
@@ -963,11 +1076,13 @@ class DiplomacyAgent:
                     # Check if essential data ('updated_goals' or 'goals') is present AND is a list (for goals)
                     # For relationships, check for 'updated_relationships' or 'relationships' AND is a dict.
                     # Consider it TRUE if at least one of the primary data structures (goals or relationships) is present and correctly typed.
-                    goals_present_and_valid = isinstance(update_data.get('updated_goals'), list) or isinstance(update_data.get('goals'), list)
-                    rels_present_and_valid = isinstance(update_data.get('updated_relationships'), dict) or isinstance(update_data.get('relationships'), dict)
+                    goals_present_and_valid = _first_valid(update_data, _STATE_GOALS_KEYS, _is_list)[0] is not None
+                    rels_present_and_valid = _first_valid(update_data, _STATE_RELATIONSHIPS_KEYS, _is_dict)[0] is not None
 
                     if update_data and (goals_present_and_valid or rels_present_and_valid):
                         log_entry_success = "TRUE"
+                        if not from_cache:
+                            await store_llm_response(cache_key, response)
                     elif update_data: # Parsed, but maybe not all essential data there or not correctly typed
                         log_entry_success = "PARTIAL" 
                         log_entry_response_type = 'state_update_partial_data'
@@ -1001,7 +1116,10 @@ class DiplomacyAgent:
             )
 
             # Fallback logic if update_data is still None or not usable
-            if not update_data or not (isinstance(update_data.get('updated_goals'), list) or isinstance(update_data.get('goals'), list) or isinstance(update_data.get('updated_relationships'), dict) or isinstance(update_data.get('relationships'), dict)):
+            if not update_data or (
+                _first_valid(update_data, _STATE_GOALS_KEYS, _is_list)[0] is None
+                and _first_valid(update_data, _STATE_RELATIONSHIPS_KEYS, _is_dict)[0] is None
+            ):
                  logger.warning(f"[{power_name}] update_data is None or missing essential valid structures after LLM call. Using existing goals and relationships as fallback.")
                  update_data = {
                     "updated_goals": self.goals, 
@@ -1011,17 +1129,10 @@ class DiplomacyAgent:
 
             # Check for both possible key names (prompt uses "goals"/"relationships", 
             # but code was expecting "updated_goals"/"updated_relationships")
-            updated_goals = update_data.get('updated_goals')
-            if updated_goals is None:
-                updated_goals = update_data.get('goals')
-                if updated_goals is not None:
-                    logger.debug(f"[{power_name}] Using 'goals' key instead of 'updated_goals'")
-            
-            updated_relationships = update_data.get('updated_relationships')
-            if updated_relationships is None:
-                updated_relationships = update_data.get('relationships')
-                if updated_relationships is not None:
-                    logger.debug(f"[{power_name}] Using 'relationships' key instead of 'updated_relationships'")
+            goals_key, updated_goals = _first_valid(update_data, _STATE_GOALS_KEYS, _is_not_none)
+            rels_key, updated_relationships = _first_valid(update_data, _STATE_RELATIONSHIPS_KEYS, _is_not_none)
+            if goals_key == 'goals' or rels_key == 'relationships':
+                logger.debug(f"[{power_name}] Using state update keys: goals={goals_key!r}, relationships={rels_key!r}")
 
             if isinstance(updated_goals, list):
                 # Simple overwrite for now, could be more sophisticated (e.g., merging)
@@ -1037,25 +1148,28 @@ class DiplomacyAgent:
                 invalid_count = 0
                 
                 for p, r in updated_relationships.items():
-                    # Convert power name to uppercase for case-insensitive matching
-                    p_upper = p.upper()
-                    if p_upper in ALL_POWERS and p_upper != power_name:
-                        # Check against allowed labels (case-insensitive)
-                        r_title = r.title() if isinstance(r, str) else r  # Convert "enemy" to "Enemy" etc.
-                        if r_title in ALLOWED_RELATIONSHIPS:
-                            valid_new_relationships[p_upper] = r_title
-                        else:
-                            invalid_count += 1
-                            if invalid_count <= 2:  # Only log first few to reduce noise
-                                logger.warning(f"[{power_name}] Received invalid relationship label '{r}' for '{p}'. Ignoring.")
+                    # Convert power name to uppercase for case-insensitive matching.
+                    # ALL_POWERS / ALLOWED_RELATIONSHIPS_SET are canonical frozensets.
+                    p_upper = p.upper() if type(p) is str else str(p).upper()
+                    if p_upper == power_name or p_upper not in ALL_POWERS:
+                        invalid_count += 1
+                        if invalid_count <= 2:  # Only log first few to reduce noise
+                            logger.warning("[%s] Received relationship for invalid/own power '%s' (normalized: %s). Ignoring.", power_name, p, p_upper)
+                        continue
+                    try:
+                        r_title = r.title()  # Convert "enemy" to "Enemy" etc.
+                    except AttributeError:
+                        r_title = None
+                    if r_title in ALLOWED_RELATIONSHIPS_SET:
+                        valid_new_relationships[p_upper] = r_title
                     else:
                         invalid_count += 1
-                        if invalid_count <= 2 and not p_upper.startswith(power_name):  # Only log first few to reduce noise
-                            logger.warning(f"[{power_name}] Received relationship for invalid/own power '{p}' (normalized: {p_upper}). Ignoring.")
+                        if invalid_count <= 2:  # Only log first few to reduce noise
+                            logger.warning("[%s] Received invalid relationship label '%s' for '%s'. Ignoring.", power_name, r, p)
                 
                 # Summarize if there were many invalid entries
                 if invalid_count > 2:
-                    logger.warning(f"[{power_name}] {invalid_count} total invalid relationships were ignored.")
+                    logger.warning("[%s] %d total invalid relationships were ignored.", power_name, invalid_count)
                     
                 # Update relationships if the dictionary is not empty after validation
                 if valid_new_relationships:
@@ -1067,6 +1181,11 @@ class DiplomacyAgent:
                      logger.warning(f"[{power_name}] LLM did not provide valid 'updated_relationships' dict in state update.")
                      # Keep current relationships, no update needed
 
+            # Only a successfully applied update lets the next unchanged phase skip;
+            # after a failed one the following retreat/build phase retries.
+            if log_entry_success == "TRUE":
+                self._last_state_update_sig = state_sig
+
         except FileNotFoundError:
             logger.error(f"[{power_name}] state_update_prompt.txt not found. Skipping state update.")
         except Exception as e:
@@ -1079,37 +1198,50 @@ class DiplomacyAgent:
         """Updates the agent's strategic goals."""
         self.goals = new_goals
         self.add_journal_entry(f"Goals updated: {self.goals}")
-        logger.info(f"[{self.power_name}] Goals updated to: {self.goals}")
+        logger.info("[%s] Goals updated to: %s", self.power_name, self.goals)
 
     def update_relationship(self, other_power: str, status: str):
         """Updates the agent's perceived relationship with another power."""
         if other_power != self.power_name:
              self.relationships[other_power] = status
              self.add_journal_entry(f"Relationship with {other_power} updated to {status}.")
-             logger.info(f"[{self.power_name}] Relationship with {other_power} set to {status}.")
+             logger.info("[%s] Relationship with %s set to %s.", self.power_name, other_power, status)
         else:
-             logger.warning(f"[{self.power_name}] Attempted to set relationship with self.")
+             logger.warning("[%s] Attempted to set relationship with self.", self.power_name)
 
     def get_agent_state_summary(self) -> str:
         """Returns a string summary of the agent's current state."""
-        summary = f"Agent State for {self.power_name}:\n"
-        summary += f"  Goals: {self.goals}\n"
-        summary += f"  Relationships: {self.relationships}\n"
-        summary += f"  Journal Entries: {len(self.private_journal)}"
+        parts = [
+            f"Agent State for {self.power_name}:",
+            f"  Goals: {self.goals}",
+            f"  Relationships: {self.relationships}",
+            f"  Journal Entries: {len(self.private_journal)}",
+        ]
         # Optionally include last few journal entries
         # if self.private_journal:
-        #    summary += f"\n  Last Journal Entry: {self.private_journal[-1]}"
-        return summary
+        #    parts.append(f"  Last Journal Entry: {self.private_journal[-1]}")
+        return "\n".join(parts)
 
-    def generate_plan(self, game: Game, board_state: dict, game_history: 'GameHistory') -> str:
+    async def generate_plan(self, game: Game, board_state: dict, game_history: 'GameHistory', log_file_path: str) -> str:
         """Generates a strategic plan using the client and logs it."""
-        logger.info(f"Agent {self.power_name} generating strategic plan...")
+        logger.info("Agent %s generating strategic plan...", self.power_name)
         try:
-            plan = self.client.get_plan(game, board_state, self.power_name, game_history)
-            self.add_journal_entry(f"Generated plan for phase {game.current_phase}:\n{plan}")
-            logger.info(f"Agent {self.power_name} successfully generated plan.")
+            plan = await self.client.get_plan(
+                game,
+                board_state,
+                self.power_name,
+                game_history,
+                log_file_path,
+                agent_goals=self.goals,
+                agent_relationships=self.relationships,
+                agent_private_diary_str=self.format_private_diary_for_prompt(),
+            )
+            if plan.startswith("Error:"):
+                return plan
+            self.add_journal_entry(f"Generated plan for phase {game.current_short_phase}:\n{plan}")
+            logger.info("Agent %s successfully generated plan.", self.power_name)
             return plan
         except Exception as e:
-            logger.error(f"Agent {self.power_name} failed to generate plan: {e}")
-            self.add_journal_entry(f"Failed to generate plan for phase {game.current_phase} due to error: {e}")
+            logger.error("Agent %s failed to generate plan: %s", self.power_name, e)
+            self.add_journal_entry(f"Failed to generate plan for phase {game.current_short_phase} due to error: {e}")
             return "Error: Failed to generate plan."
\ No newline at end of file
@@ -1,9 +1,9 @@
 import os
+import asyncio
 import json
 from json import JSONDecodeError
 import re
 import logging
-import ast  # For literal_eval in JSON fallback parsing
 import aiohttp  # For direct HTTP requests to Responses API
 
 from typing import List, Dict, Optional, Any, Tuple
@@ -20,10 +20,32 @@ from together.error import APIError as TogetherAPIError # For specific error han
 
 from diplomacy.engine.message import GLOBAL
 from .game_history import GameHistory
-from .utils import load_prompt, run_llm_and_log, log_llm_response, generate_random_seed
+from .utils import (
+    load_prompt,
+    run_llm_and_log,
+    log_llm_response,
+    generate_random_seed,
+    LLM_REQUEST_TIMEOUT,
+)
+from .llm_cache import llm_cache_key, get_cached_llm_response, store_llm_response
 # Import DiplomacyAgent for type hinting if needed, but avoid circular import if possible
 from .prompt_constructor import construct_order_generation_prompt, build_context_prompt
 
+try:
+    import orjson  # Optional: faster C parser/serializer for well-formed JSON
+    _fast_json_loads = orjson.loads  # orjson.JSONDecodeError subclasses json.JSONDecodeError
+
+    def _fast_json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    _fast_json_dumpb = orjson.dumps  # UTF-8 bytes, ready to send as a request body
+except ImportError:
+    _fast_json_loads = json.loads
+    _fast_json_dumps = json.dumps
+
+    def _fast_json_dumpb(obj) -> bytes:
+        return json.dumps(obj).encode()
+
 # set logger back to just info
 logger = logging.getLogger("client")
 logger.setLevel(logging.DEBUG) # Keep debug for now during async changes
@@ -32,6 +54,147 @@ logger.setLevel(logging.DEBUG) # Keep debug for now during async changes
 
 load_dotenv()
 
+# Chat-completions kwargs that ask OpenAI-compatible APIs for a JSON object reply
+JSON_OBJECT_RESPONSE_FORMAT = {"response_format": {"type": "json_object"}}
+
+# SDK clients (AsyncOpenAI, AsyncAnthropic, ...) keyed by class and constructor kwargs.
+# Powers playing the same provider share one instance and its HTTP connection pool;
+# BaseModelClient instances themselves stay per power since they carry the system prompt.
+_SDK_CLIENTS: dict[tuple[Any, tuple[tuple[str, Any], ...]], Any] = {}
+
+
+def _shared_sdk_client(factory, **kwargs):
+    key = (factory, tuple(sorted(kwargs.items())))
+    client = _SDK_CLIENTS.get(key)
+    if client is None:
+        client = _SDK_CLIENTS[key] = factory(**kwargs)
+    return client
+
+
+# Shared aiohttp session for the direct-HTTP clients, bound to the loop that created it
+_AIOHTTP_SESSION: tuple[Any, aiohttp.ClientSession] | None = None
+
+
+async def _get_aiohttp_session() -> aiohttp.ClientSession:
+    """
+    Returns the module-wide aiohttp session, creating it on first use (or after the
+    previous one was closed or its event loop went away). Reusing one pooled session
+    keeps TCP/TLS connections alive across LLM calls instead of re-handshaking each time.
+    """
+    global _AIOHTTP_SESSION
+    loop = asyncio.get_running_loop()
+    if _AIOHTTP_SESSION is None or _AIOHTTP_SESSION[0] is not loop or _AIOHTTP_SESSION[1].closed:
+        connector = aiohttp.TCPConnector(limit=100, limit_per_host=32, keepalive_timeout=75, ttl_dns_cache=300)
+        _AIOHTTP_SESSION = (loop, aiohttp.ClientSession(connector=connector))
+    return _AIOHTTP_SESSION[1]
+
+
+async def close_http_sessions() -> None:
+    """Closes the shared aiohttp session; call once before the event loop shuts down."""
+    global _AIOHTTP_SESSION
+    if _AIOHTTP_SESSION is not None:
+        session = _AIOHTTP_SESSION[1]
+        _AIOHTTP_SESSION = None
+        if not session.closed:
+            await session.close()
+
+
+# == Precompiled regexes used by order and message parsing ==
+_RE_PARSABLE = re.compile(r"PARSABLE OUTPUT:\s*(\{[\s\S]*\})", re.DOTALL)
+_RE_PARSABLE_INLINE = re.compile(r"PARSABLE OUTPUT\s*\{(.*?)\}\s*$", re.DOTALL)
+_RE_PARSABLE_ASTERISK = re.compile(r"\*\*PARSABLE OUTPUT:\*\*\s*(\{[\s\S]*?\})", re.DOTALL)
+_RE_BARE_ORDERS = re.compile(r'(\{[^{}]*"orders"\s*:\s*\[[^\]]*\][^{}]*\})', re.DOTALL)
+_RE_BRACKET_ORDERS = re.compile(r'["\']orders["\']\s*:\s*\[([^\]]*)\]', re.DOTALL)
+_RE_TRAILING_COMMA = re.compile(r',\s*([\}\]])')
+_RE_DOUBLE_BRACE = re.compile(r'\{\{(.*?)\}\}', re.DOTALL)
+_RE_ANY_OBJECT = re.compile(r'\{.*?\}', re.DOTALL)
+# A double- or single-quoted list item (group 1 or 2), for the bracket fallback
+_RE_QUOTED_ITEM = re.compile(r'"((?:\\.|[^"\\])*)"|\'((?:\\.|[^\'\\])*)\'')
+# A double-quoted string (kept) or a // comment running to end of line (group 1, dropped)
+_RE_LINE_COMMENT = re.compile(r'"(?:\\.|[^"\\\n])*"|([^\S\n]*//[^\n]*)')
+
+
+def _strip_line_comment(match: re.Match) -> str:
+    return "" if match.group(1) is not None else match.group(0)
+
+
+# Raw control characters that are invalid inside JSON strings, mapped to their escapes
+_JSON_STRING_ESCAPES = str.maketrans({"\n": "\\n", "\r": "\\r", "\t": "\\t"})
+
+
+def _escape_json_strings(block: str) -> str:
+    """
+    Escapes newlines, carriage returns and tabs inside every closed "..." span of
+    `block`. Splitting on '"' puts the quoted spans at the odd indices (pairing quotes
+    left to right), so one split/translate/join replaces a per-match regex callback.
+    """
+    parts = block.split('"')
+    for i in range(1, len(parts) - 1, 2):
+        parts[i] = parts[i].translate(_JSON_STRING_ESCAPES)
+    return '"'.join(parts)
+
+
+def _fence_body(text: str, opener: str) -> str | None:
+    """
+    Returns the body of the first `opener` ... "\n```" code fence in `text`, or None.
+    Both delimiters are fixed literals, so two str.find scans replace a lazy
+    DOTALL regex (same result as re.search(opener + r"(.*?)\n```").group(1)).
+    """
+    start = text.find(opener)
+    if start < 0:
+        return None
+    start += len(opener)
+    end = text.find("\n```", start)
+    return None if end < 0 else text[start:end]
+
+
+def _json_fence_body(text: str) -> str | None:
+    return _fence_body(text, "```json\n")
+
+
+def _plain_fence_body(text: str) -> str | None:
+    return _fence_body(text, "```\n")
+
+
+def _first_group(pattern: re.Pattern):
+    """Wraps `pattern` as a finder returning its first group at the first match, or None."""
+    def find(text: str) -> str | None:
+        m = pattern.search(text)
+        return m.group(1) if m else None
+    return find
+
+
+def _hold_or_first(orders_list: list[str]) -> str:
+    """The first HOLD order for a unit, else its first possible order (stops at the first hit)."""
+    return next((o for o in orders_list if o.endswith("H")), orders_list[0])
+
+
+def _message_blocks_from_json(text: str) -> list[str] | None:
+    """
+    Parses `text` as a JSON object or array of objects and returns each object
+    re-serialized as a message block, or None if `text` is not valid JSON.
+    """
+    try:
+        data = _fast_json_loads(text)
+    except json.JSONDecodeError:
+        return None
+    if isinstance(data, list):
+        return [_fast_json_dumps(item) for item in data if isinstance(item, dict)]
+    if isinstance(data, dict):
+        return [_fast_json_dumps(data)]
+    return []
+
+
+# (literal marker, finder, description) in the priority order _extract_moves tries them
+_ORDER_BLOCK_PATTERNS = (
+    ("PARSABLE OUTPUT", _first_group(_RE_PARSABLE), "PARSABLE OUTPUT block"),
+    ("PARSABLE OUTPUT", _first_group(_RE_PARSABLE_INLINE), "inline PARSABLE OUTPUT block"),
+    ("PARSABLE OUTPUT", _first_group(_RE_PARSABLE_ASTERISK), "asterisk-wrapped PARSABLE OUTPUT block"),
+    ("```", _json_fence_body, "triple-backtick JSON block"),
+    ("```", _plain_fence_body, "plain triple-backtick block"),
+    ('"orders"', _first_group(_RE_BARE_ORDERS), "bare JSON object with 'orders' key"),
+)
+
 ##############################################################################
 # 1) Base Interface
 ##############################################################################
@@ -44,22 +207,34 @@ class BaseModelClient:
       - get_conversation_reply(power_name, conversation_so_far, game_phase) -> str
     """
 
+    # Fixed attribute layout shared by every provider client; subclasses add none
+    __slots__ = (
+        "_headers", "_system_msg", "api_key", "base_url", "client",
+        "max_tokens", "model_name", "prompts_dir", "request_timeout", "system_prompt",
+    )
+
     def __init__(self, model_name: str, prompts_dir: Optional[str] = None):
         self.model_name = model_name
         self.prompts_dir = prompts_dir
         # Load a default initially, can be overwritten by set_system_prompt
-        self.system_prompt = load_prompt("system_prompt.txt", prompts_dir=self.prompts_dir) 
+        self.system_prompt = load_prompt("system_prompt.txt", prompts_dir=self.prompts_dir)
+        # Chat-format system message, rebuilt only when the prompt changes
+        self._system_msg = {"role": "system", "content": self.system_prompt}
         self.max_tokens = 16000  # default unless overridden
+        # Per-attempt timeout for order and negotiation calls (DIPLOMACY_LLM_TIMEOUT)
+        self.request_timeout = LLM_REQUEST_TIMEOUT
 
     def set_system_prompt(self, content: str):
         """Allows updating the system prompt after initialization."""
         self.system_prompt = content
+        self._system_msg = {"role": "system", "content": content}
         logger.info(f"[{self.model_name}] System prompt updated.")
 
-    async def generate_response(self, prompt: str, temperature: float = 0.0, inject_random_seed: bool = True) -> str:
+    async def generate_response(self, prompt: str, temperature: float = 0.0, inject_random_seed: bool = True, json_mode: bool = False) -> str:
         """
         Returns a raw string from the LLM.
-        Subclasses override this.
+        Subclasses override this. When json_mode is set, clients whose API
+        supports it ask the model for a JSON object response; others ignore it.
         """
         raise NotImplementedError("Subclasses must implement generate_response().")
 
@@ -115,10 +290,12 @@ class BaseModelClient:
                 power_name=power_name,
                 phase=phase,
                 response_type='order', # Context for run_llm_and_log's own error logging
-                temperature=0
+                temperature=0,
+                timeout=self.request_timeout,
+                max_attempts=3,
             )
             logger.debug(
-                f"[{self.model_name}] Raw LLM response for {power_name} orders:\n{raw_response}"
+                "[%s] Raw LLM response for %s orders:\n%s", self.model_name, power_name, raw_response
             )
 
             # Attempt to parse the final "orders" from the LLM
@@ -136,7 +313,7 @@ class BaseModelClient:
             else:
                 # Validate or fallback
                 validated_moves, invalid_moves_list = self._validate_orders(move_list, possible_orders)
-                logger.debug(f"[{self.model_name}] Validated moves for {power_name}: {validated_moves}")
+                logger.debug("[%s] Validated moves for %s: %s", self.model_name, power_name, validated_moves)
                 parsed_orders_for_return = validated_moves
                 if invalid_moves_list:
                     # Truncate if too many invalid moves to keep log readable
@@ -190,69 +367,23 @@ class BaseModelClient:
 
         Returns a list of move strings or None if everything fails.
         """
-        # 1) Regex for "PARSABLE OUTPUT:{...}"
-        pattern = r"PARSABLE OUTPUT:\s*(\{[\s\S]*\})"
-        matches = re.search(pattern, raw_response, re.DOTALL)
-
-        if not matches:
-            # Some LLMs might not put the colon or might have triple backtick fences.
-            logger.debug(
-                f"[{self.model_name}] Regex parse #1 failed for {power_name}. Trying alternative patterns."
-            )
-
-            # 1b) Check for inline JSON after "PARSABLE OUTPUT"
-            pattern_alt = r"PARSABLE OUTPUT\s*\{(.*?)\}\s*$"
-            matches = re.search(pattern_alt, raw_response, re.DOTALL)
-            
-        if not matches:
-            # 1c) Check for **PARSABLE OUTPUT:** pattern (with asterisks)
-            logger.debug(
-                f"[{self.model_name}] Regex parse #2 failed for {power_name}. Trying asterisk-wrapped pattern."
-            )
-            pattern_asterisk = r"\*\*PARSABLE OUTPUT:\*\*\s*(\{[\s\S]*?\})"
-            matches = re.search(pattern_asterisk, raw_response, re.DOTALL)
-
-        if not matches:
-            logger.debug(
-                f"[{self.model_name}] Regex parse #3 failed for {power_name}. Trying triple-backtick code fences."
-            )
-
-        # 2) If still no match, check for triple-backtick code fences containing JSON
-        if not matches:
-            code_fence_pattern = r"```json\n(.*?)\n```"
-            matches = re.search(code_fence_pattern, raw_response, re.DOTALL)
-            if matches:
-                logger.debug(
-                    f"[{self.model_name}] Found triple-backtick JSON block for {power_name}."
-                )
-        
-        # 2b) Also try plain ``` code fences without json marker
-        if not matches:
-            code_fence_plain = r"```\n(.*?)\n```"
-            matches = re.search(code_fence_plain, raw_response, re.DOTALL)
-            if matches:
-                logger.debug(
-                    f"[{self.model_name}] Found plain triple-backtick block for {power_name}."
-                )
-        
-        # 2c) Try to find bare JSON object anywhere in the response
-        if not matches:
-            logger.debug(
-                f"[{self.model_name}] No explicit markers found for {power_name}. Looking for bare JSON."
-            )
-            # Look for a JSON object that contains "orders" key
-            bare_json_pattern = r'(\{[^{}]*"orders"\s*:\s*\[[^\]]*\][^{}]*\})'
-            matches = re.search(bare_json_pattern, raw_response, re.DOTALL)
-            if matches:
-                logger.debug(
-                    f"[{self.model_name}] Found bare JSON object with 'orders' key for {power_name}."
-                )
+        # 1) PARSABLE OUTPUT variants, 2) code fences, 2c) bare JSON with an "orders" key.
+        # Patterns are tried in priority order; a pattern whose literal marker is
+        # absent from the response is skipped without running the regex at all.
+        captured = None
+        for marker, finder, label in _ORDER_BLOCK_PATTERNS:
+            if marker not in raw_response:
+                continue
+            captured = finder(raw_response)
+            if captured is not None:
+                logger.debug("[%s] Found %s for %s.", self.model_name, label, power_name)
+                break
 
         # 3) Attempt to parse JSON if we found anything
         json_text = None
-        if matches:
+        if captured is not None:
             # Add braces back around the captured group if needed
-            captured = matches.group(1).strip()
+            captured = captured.strip()
             if captured.startswith(r"{{"):
                 json_text = captured[1:-1]
             elif captured.startswith(r"{"):
@@ -264,13 +395,13 @@ class BaseModelClient:
 
         if not json_text:
             logger.debug(
-                f"[{self.model_name}] No JSON text found in LLM response for {power_name}."
+                "[%s] No JSON text found in LLM response for %s.", self.model_name, power_name
             )
             return None
 
         # 3a) Try JSON loading
         try:
-            data = json.loads(json_text)
+            data = _fast_json_loads(json_text)
             return data.get("orders", None)
         except json.JSONDecodeError as e:
             logger.warning(
@@ -280,11 +411,11 @@ class BaseModelClient:
             # Try to fix common JSON issues
             try:
                 # Remove trailing commas
-                fixed_json = re.sub(r',\s*([\}\]])', r'\1', json_text)
+                fixed_json = _RE_TRAILING_COMMA.sub(r'\1', json_text)
                 # Fix single quotes to double quotes
                 fixed_json = fixed_json.replace("'", '"')
                 # Try parsing again
-                data = json.loads(fixed_json)
+                data = _fast_json_loads(fixed_json)
                 logger.info(f"[{self.model_name}] Successfully parsed JSON after fixes for {power_name}")
                 return data.get("orders", None)
             except json.JSONDecodeError:
@@ -294,39 +425,13 @@ class BaseModelClient:
                 
                 # Try to remove inline comments (// style)
                 try:
-                    # Remove // comments from each line
-                    lines = json_text.split('\n')
-                    cleaned_lines = []
-                    for line in lines:
-                        # Find // that's not inside quotes
-                        comment_pos = -1
-                        in_quotes = False
-                        escape_next = False
-                        for i, char in enumerate(line):
-                            if escape_next:
-                                escape_next = False
-                                continue
-                            if char == '\\':
-                                escape_next = True
-                                continue
-                            if char == '"' and not escape_next:
-                                in_quotes = not in_quotes
-                            if not in_quotes and line[i:i+2] == '//':
-                                comment_pos = i
-                                break
-                        
-                        if comment_pos >= 0:
-                            # Remove comment but keep any trailing comma
-                            cleaned_line = line[:comment_pos].rstrip()
-                        else:
-                            cleaned_line = line
-                        cleaned_lines.append(cleaned_line)
-                    
-                    comment_free_json = '\n'.join(cleaned_lines)
+                    # Remove // comments from each line; quoted strings are matched first and
+                    # kept as-is, so a "//" inside a string is never treated as a comment
+                    comment_free_json = _RE_LINE_COMMENT.sub(_strip_line_comment, json_text)
                     # Also remove trailing commas after comment removal
-                    comment_free_json = re.sub(r',\s*([\}\]])', r'\1', comment_free_json)
+                    comment_free_json = _RE_TRAILING_COMMA.sub(r'\1', comment_free_json)
                     
-                    data = json.loads(comment_free_json)
+                    data = _fast_json_loads(comment_free_json)
                     logger.info(f"[{self.model_name}] Successfully parsed JSON after removing inline comments for {power_name}")
                     return data.get("orders", None)
                 except json.JSONDecodeError:
@@ -337,12 +442,19 @@ class BaseModelClient:
         # 3b) Attempt bracket fallback: we look for the substring after "orders"
         #     E.g. "orders: ['A BUD H']" and parse it. This is risky but can help with minor JSON format errors.
         #     We only do this if we see something like "orders": ...
-        bracket_pattern = r'["\']orders["\']\s*:\s*\[([^\]]*)\]'
-        bracket_match = re.search(bracket_pattern, json_text, re.DOTALL)
+        bracket_match = _RE_BRACKET_ORDERS.search(json_text)
         if bracket_match:
             try:
                 raw_list_str = "[" + bracket_match.group(1).strip() + "]"
-                moves = ast.literal_eval(raw_list_str)
+                # The payload is a flat list of order strings, so the JSON parser handles it
+                # once quotes and trailing commas are normalized.
+                normalized = _RE_TRAILING_COMMA.sub(r'\1', raw_list_str.replace("'", '"'))
+                try:
+                    moves = _fast_json_loads(normalized)
+                except json.JSONDecodeError:
+                    # Mixed quoting (e.g. an apostrophe inside a double-quoted item):
+                    # pull the quoted items out directly.
+                    moves = [dq or sq for dq, sq in _RE_QUOTED_ITEM.findall(raw_list_str)] or None
                 if isinstance(moves, list):
                     return moves
             except Exception as e2:
@@ -360,34 +472,42 @@ class BaseModelClient:
         Filter out invalid moves, fill missing with HOLD, else fallback.
         Returns a tuple: (validated_moves, invalid_moves_found)
         """
-        logger.debug(f"[{self.model_name}] Proposed LLM moves: {moves}")
+        logger.debug("[%s] Proposed LLM moves: %s", self.model_name, moves)
         validated = []
         invalid_moves_found = [] # ADDED: To collect invalid moves
         used_locs = set()
 
         if not isinstance(moves, list):
-            logger.debug(f"[{self.model_name}] Moves not a list, fallback.")
+            logger.debug("[%s] Moves not a list, fallback.", self.model_name)
             # Return fallback and empty list for invalid_moves_found as no specific LLM moves were processed
             return self.fallback_orders(possible_orders), [] 
         
+        # Flatten once so each proposed move is an O(1) lookup instead of a scan of every list
+        all_possible_orders = set()
+        for loc_orders in possible_orders.values():
+            all_possible_orders.update(loc_orders)
+
         for move_str in moves:
+            # LLMs sometimes emit structured items (e.g. {"unit": ..., "action": ...});
+            # they are unhashable, so report them as invalid before the set lookup
+            if not isinstance(move_str, str):
+                logger.debug("[%s] Invalid move from LLM: %s", self.model_name, move_str)
+                invalid_moves_found.append(move_str)
+                continue
             # Check if it's in possible orders
-            if any(move_str in loc_orders for loc_orders in possible_orders.values()):
+            if move_str in all_possible_orders:
                 validated.append(move_str)
                 parts = move_str.split()
                 if len(parts) >= 2:
                     used_locs.add(parts[1][:3])
             else:
-                logger.debug(f"[{self.model_name}] Invalid move from LLM: {move_str}")
+                logger.debug("[%s] Invalid move from LLM: %s", self.model_name, move_str)
                 invalid_moves_found.append(move_str) # ADDED: Collect invalid move
 
         # Fill missing with hold
         for loc, orders_list in possible_orders.items():
             if loc not in used_locs and orders_list:
-                hold_candidates = [o for o in orders_list if o.endswith("H")]
-                validated.append(
-                    hold_candidates[0] if hold_candidates else orders_list[0]
-                )
+                validated.append(_hold_or_first(orders_list))
 
         if not validated and not invalid_moves_found: # Only if LLM provided no valid moves and no invalid moves (e.g. empty list from LLM)
             logger.warning(f"[{self.model_name}] No valid LLM moves provided and no invalid ones to report. Using fallback.")
@@ -407,8 +527,7 @@ class BaseModelClient:
         fallback = []
         for loc, orders_list in possible_orders.items():
             if orders_list:
-                holds = [o for o in orders_list if o.endswith("H")]
-                fallback.append(holds[0] if holds else orders_list[0])
+                fallback.append(_hold_or_first(orders_list))
         return fallback
 
     def build_planning_prompt(
@@ -427,7 +546,7 @@ class BaseModelClient:
         
         instructions = load_prompt("planning_instructions.txt", prompts_dir=self.prompts_dir)
 
-        context = self.build_context_prompt(
+        context = build_context_prompt(
             game,
             board_state,
             power_name,
@@ -523,7 +642,7 @@ class BaseModelClient:
             phase=game_phase, # Use game_phase for logging
             response_type='plan_reply', # Changed from 'plan' to avoid confusion
         )
-        logger.debug(f"[{self.model_name}] Raw LLM response for {power_name} planning reply:\n{raw_response}")
+        logger.debug("[%s] Raw LLM response for %s planning reply:\n%s", self.model_name, power_name, raw_response)
         return raw_response
     
     async def get_conversation_reply(
@@ -560,7 +679,7 @@ class BaseModelClient:
                 agent_private_diary_str=agent_private_diary_str, 
             )
 
-            logger.debug(f"[{self.model_name}] Conversation prompt for {power_name}:\n{raw_input_prompt}")
+            logger.debug("[%s] Conversation prompt for %s:\n%s", self.model_name, power_name, raw_input_prompt)
 
             raw_response = await run_llm_and_log(
                 client=self,
@@ -569,36 +688,41 @@ class BaseModelClient:
                 power_name=power_name,
                 phase=game_phase, 
                 response_type='negotiation', # For run_llm_and_log's internal context
+                timeout=self.request_timeout,
+                max_attempts=3,
             )
-            logger.debug(f"[{self.model_name}] Raw LLM response for {power_name}:\n{raw_response}")
+            logger.debug("[%s] Raw LLM response for %s:\n%s", self.model_name, power_name, raw_response)
             
             parsed_messages = []
             json_blocks = []
             json_decode_error_occurred = False
             
-            # Attempt to find blocks enclosed in {{...}}
-            double_brace_blocks = re.findall(r'\{\{(.*?)\}\}', raw_response, re.DOTALL)
-            if double_brace_blocks:
-                # If {{...}} blocks are found, assume each is a self-contained JSON object
-                json_blocks.extend(['{' + block.strip() + '}' for block in double_brace_blocks])
-            else:
-                # If no {{...}} blocks, look for ```json ... ``` markdown blocks
-                code_block_match = re.search(r"```json\n(.*?)\n```", raw_response, re.DOTALL)
-                if code_block_match:
-                    potential_json_array_or_objects = code_block_match.group(1).strip()
-                    # Try to parse as a list of objects or a single object
-                    try:
-                        data = json.loads(potential_json_array_or_objects)
-                        if isinstance(data, list):
-                            json_blocks = [json.dumps(item) for item in data if isinstance(item, dict)]
-                        elif isinstance(data, dict):
-                            json_blocks = [json.dumps(data)]
-                    except json.JSONDecodeError:
-                        # If parsing the whole block fails, fall back to regex for individual objects
-                        json_blocks = re.findall(r'\{.*?\}', potential_json_array_or_objects, re.DOTALL)
+            # The prompt asks for a bare JSON array of message objects, so first try the
+            # whole reply in one parse; the regex passes below only run when that fails.
+            stripped_response = raw_response.strip()
+            if stripped_response[:1] in ("[", "{"):
+                json_blocks = _message_blocks_from_json(stripped_response) or []
+
+            if not json_blocks:
+                # Attempt to find blocks enclosed in {{...}}
+                # Cheap substring checks skip regex scans whose markers are absent
+                double_brace_blocks = _RE_DOUBLE_BRACE.findall(raw_response) if "{{" in raw_response else []
+                if double_brace_blocks:
+                    # If {{...}} blocks are found, assume each is a self-contained JSON object
+                    json_blocks.extend(['{' + block.strip() + '}' for block in double_brace_blocks])
                 else:
-                    # If no markdown block, fall back to regex for any JSON object in the response
-                    json_blocks = re.findall(r'\{.*?\}', raw_response, re.DOTALL)
+                    # If no {{...}} blocks, look for ```json ... ``` markdown blocks
+                    code_block = _json_fence_body(raw_response)
+                    if code_block is not None:
+                        potential_json_array_or_objects = code_block.strip()
+                        # Try to parse as a list of objects or a single object; if parsing the
+                        # whole block fails, fall back to regex for individual objects
+                        json_blocks = _message_blocks_from_json(potential_json_array_or_objects)
+                        if json_blocks is None:
+                            json_blocks = _RE_ANY_OBJECT.findall(potential_json_array_or_objects)
+                    else:
+                        # If no markdown block, fall back to regex for any JSON object in the response
+                        json_blocks = _RE_ANY_OBJECT.findall(raw_response)
 
             if not json_blocks:
                 logger.warning(f"[{self.model_name}] No JSON message blocks found in response for {power_name}. Raw response:\n{raw_response}")
@@ -609,8 +733,8 @@ class BaseModelClient:
                     try:
                         cleaned_block = block.strip()
                         # Attempt to fix common JSON issues like trailing commas before parsing
-                        cleaned_block = re.sub(r',\s*([\}\]])', r'\1', cleaned_block) 
-                        parsed_message = json.loads(cleaned_block)
+                        cleaned_block = _RE_TRAILING_COMMA.sub(r'\1', cleaned_block) 
+                        parsed_message = _fast_json_loads(cleaned_block)
                         
                         if isinstance(parsed_message, dict) and "message_type" in parsed_message and "content" in parsed_message:
                             # Further validation, e.g., recipient for private messages
@@ -622,37 +746,31 @@ class BaseModelClient:
                             logger.warning(f"[{self.model_name}] Invalid message structure or missing keys in block {block_index} for {power_name}: {cleaned_block}")
                              
                     except json.JSONDecodeError as jde:
-                        # Try to fix unescaped newlines and retry parsing
-                        try:
-                            # Fix unescaped newlines and other control characters in JSON strings
-                            def escape_json_string(match):
-                                # Get the string content (without quotes)
-                                string_content = match.group(1)
-                                # Escape newlines, tabs, and carriage returns
-                                string_content = string_content.replace('\n', '\\n')
-                                string_content = string_content.replace('\r', '\\r')
-                                string_content = string_content.replace('\t', '\\t')
-                                # Return with quotes
-                                return '"' + string_content + '"'
-                            
-                            # Apply escaping to all string values in the JSON
-                            fixed_block = re.sub(r'"([^"]*)"', escape_json_string, cleaned_block)
+                        # The escape fix only repairs raw newlines/CRs/tabs inside strings;
+                        # a block without any cannot be rescued, so report the original error.
+                        if "\n" not in cleaned_block and "\r" not in cleaned_block and "\t" not in cleaned_block:
+                            json_decode_error_occurred = True
+                            logger.warning(f"[{self.model_name}] Failed to decode JSON block {block_index} for {power_name}. Error: {jde}. Block content:\n{block}")
+                        else:
+                            try:
+                                # Fix unescaped newlines and other control characters in JSON strings
+                                fixed_block = _escape_json_strings(cleaned_block)
                             
-                            # Try parsing again with fixed block
-                            parsed_message = json.loads(fixed_block)
+                                # Try parsing again with fixed block
+                                parsed_message = _fast_json_loads(fixed_block)
                             
-                            if isinstance(parsed_message, dict) and "message_type" in parsed_message and "content" in parsed_message:
-                                # Further validation, e.g., recipient for private messages
-                                if parsed_message["message_type"] == "private" and "recipient" not in parsed_message:
-                                    logger.warning(f"[{self.model_name}] Private message missing recipient for {power_name} in block {block_index}. Skipping: {fixed_block}")
-                                    continue # Skip this message
-                                parsed_messages.append(parsed_message)
-                                logger.info(f"[{self.model_name}] Successfully parsed JSON block {block_index} for {power_name} after fixing escape sequences")
-                            else:
-                                logger.warning(f"[{self.model_name}] Invalid message structure or missing keys in block {block_index} for {power_name} after escape fix: {fixed_block}")
-                        except json.JSONDecodeError as jde2:
-                            json_decode_error_occurred = True
-                            logger.warning(f"[{self.model_name}] Failed to decode JSON block {block_index} for {power_name} even after escape fixes. Error: {jde}. Block content:\n{block}")
+                                if isinstance(parsed_message, dict) and "message_type" in parsed_message and "content" in parsed_message:
+                                    # Further validation, e.g., recipient for private messages
+                                    if parsed_message["message_type"] == "private" and "recipient" not in parsed_message:
+                                        logger.warning(f"[{self.model_name}] Private message missing recipient for {power_name} in block {block_index}. Skipping: {fixed_block}")
+                                        continue # Skip this message
+                                    parsed_messages.append(parsed_message)
+                                    logger.info(f"[{self.model_name}] Successfully parsed JSON block {block_index} for {power_name} after fixing escape sequences")
+                                else:
+                                    logger.warning(f"[{self.model_name}] Invalid message structure or missing keys in block {block_index} for {power_name} after escape fix: {fixed_block}")
+                            except json.JSONDecodeError:
+                                json_decode_error_occurred = True
+                                logger.warning(f"[{self.model_name}] Failed to decode JSON block {block_index} for {power_name} even after escape fixes. Error: {jde}. Block content:\n{block}")
 
                 if parsed_messages:
                     success_status = "Success: Messages extracted"
@@ -664,7 +782,7 @@ class BaseModelClient:
                     success_status = "Success: No valid messages extracted from JSON blocks"
                     messages_to_return = []
 
-            logger.debug(f"[{self.model_name}] Validated conversation replies for {power_name}: {messages_to_return}")
+            logger.debug("[%s] Validated conversation replies for %s: %s", self.model_name, power_name, messages_to_return)
             # return messages_to_return # Return will happen in finally block or after
         
         except Exception as e:
@@ -713,7 +831,7 @@ class BaseModelClient:
         # For simplicity, let's pass empty if not strictly needed by context for planning.
         possible_orders_for_context = {} # game.get_all_possible_orders() if needed by context
         
-        context_prompt = self.build_context_prompt(
+        context_prompt = build_context_prompt(
             game,
             board_state,
             power_name,
@@ -734,18 +852,28 @@ class BaseModelClient:
         plan_to_return = f"Error: Plan generation failed for {power_name} (initial state)"
 
         try:
-            # Use run_llm_and_log for the actual LLM call
-            raw_plan_response = await run_llm_and_log(
-                client=self, # Pass self (the client instance)
-                prompt=full_prompt,
-                log_file_path=log_file_path,
-                power_name=power_name,
-                phase=game.current_short_phase, 
-                response_type='plan_generation', # More specific type for run_llm_and_log context
-            )
-            logger.debug(f"[{self.model_name}] Raw LLM response for {power_name} plan generation:\n{raw_plan_response}")
+            # An identical prompt (same board, history, goals, relationships and diary)
+            # is served from the opt-in response cache (DIPLOMACY_LLM_CACHE=1).
+            cache_key = llm_cache_key(self.model_name, full_prompt, namespace=f"plan:{power_name}:{game.current_short_phase}")
+            cached_plan = await get_cached_llm_response(cache_key)
+            if cached_plan is not None:
+                logger.info(f"[{power_name}] Using cached plan response")
+                raw_plan_response = cached_plan
+            else:
+                # Use run_llm_and_log for the actual LLM call
+                raw_plan_response = await run_llm_and_log(
+                    client=self, # Pass self (the client instance)
+                    prompt=full_prompt,
+                    log_file_path=log_file_path,
+                    power_name=power_name,
+                    phase=game.current_short_phase, 
+                    response_type='plan_generation', # More specific type for run_llm_and_log context
+                )
+            logger.debug("[%s] Raw LLM response for %s plan generation:\n%s", self.model_name, power_name, raw_plan_response)
             # No parsing needed for the plan, return the raw string
             plan_to_return = raw_plan_response.strip()
+            if plan_to_return and cached_plan is None:
+                await store_llm_response(cache_key, raw_plan_response)
             success_status = "Success"
         except Exception as e:
             logger.error(f"Failed to generate plan for {power_name}: {e}", exc_info=True)
@@ -777,29 +905,33 @@ class OpenAIClient(BaseModelClient):
     For 'o3-mini', 'gpt-4o', or other OpenAI model calls.
     """
 
+    __slots__ = ()
+
     def __init__(self, model_name: str, prompts_dir: Optional[str] = None):
         super().__init__(model_name, prompts_dir=prompts_dir)
-        self.client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+        self.client = _shared_sdk_client(AsyncOpenAI, api_key=os.environ.get("OPENAI_API_KEY"))
 
-    async def generate_response(self, prompt: str, temperature: float = 0.0, inject_random_seed: bool = True) -> str:
+    async def generate_response(self, prompt: str, temperature: float = 0.0, inject_random_seed: bool = True, json_mode: bool = False) -> str:
         # Updated to new API format
         try:
             # Append the call to action to the user's prompt
             prompt_with_cta = prompt + "\n\nPROVIDE YOUR RESPONSE BELOW:"
 
-            system_prompt_content = self.system_prompt
+            # The seeded variant differs per call; otherwise reuse the prebuilt system message
+            system_msg = self._system_msg
             if inject_random_seed:
                 random_seed = generate_random_seed()
-                system_prompt_content = f"{random_seed}\n\n{self.system_prompt}"
+                system_msg = {"role": "system", "content": f"{random_seed}\n\n{self.system_prompt}"}
 
             response = await self.client.chat.completions.create(
                 model=self.model_name,
                 messages=[
-                    {"role": "system", "content": system_prompt_content},
+                    system_msg,
                     {"role": "user", "content": prompt_with_cta},
                 ],
                 temperature=temperature,
                 max_tokens=self.max_tokens,
+                **(JSON_OBJECT_RESPONSE_FORMAT if json_mode else {}),
             )
             if not response or not hasattr(response, "choices") or not response.choices:
                 logger.warning(
@@ -807,11 +939,6 @@ class OpenAIClient(BaseModelClient):
                 )
                 return ""
             return response.choices[0].message.content.strip()
-        except json.JSONDecodeError as json_err:
-            logger.error(
-                f"[{self.model_name}] JSON decoding failed in generate_response: {json_err}"
-            )
-            return ""
         except Exception as e:
             logger.error(
                 f"[{self.model_name}] Unexpected error in generate_response: {e}"
@@ -824,11 +951,13 @@ class ClaudeClient(BaseModelClient):
     For 'claude-3-5-sonnet-20241022', 'claude-3-5-haiku-20241022', etc.
     """
 
+    __slots__ = ()
+
     def __init__(self, model_name: str, prompts_dir: Optional[str] = None):
         super().__init__(model_name, prompts_dir=prompts_dir)
-        self.client = AsyncAnthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+        self.client = _shared_sdk_client(AsyncAnthropic, api_key=os.environ.get("ANTHROPIC_API_KEY"))
 
-    async def generate_response(self, prompt: str, temperature: float = 0.0, inject_random_seed: bool = True) -> str:
+    async def generate_response(self, prompt: str, temperature: float = 0.0, inject_random_seed: bool = True, json_mode: bool = False) -> str:
         # Updated Claude messages format
         try:
             system_prompt_content = self.system_prompt
@@ -849,11 +978,6 @@ class ClaudeClient(BaseModelClient):
                 )
                 return ""
             return response.content[0].text.strip() if response.content else ""
-        except json.JSONDecodeError as json_err:
-            logger.error(
-                f"[{self.model_name}] JSON decoding failed in generate_response: {json_err}"
-            )
-            return ""
         except Exception as e:
             logger.error(
                 f"[{self.model_name}] Unexpected error in generate_response: {e}"
@@ -866,6 +990,8 @@ class GeminiClient(BaseModelClient):
     For 'gemini-1.5-flash' or other Google Generative AI models.
     """
 
+    __slots__ = ()
+
     def __init__(self, model_name: str, prompts_dir: Optional[str] = None):
         super().__init__(model_name, prompts_dir=prompts_dir)
         # Configure and get the model (corrected initialization)
@@ -874,9 +1000,9 @@ class GeminiClient(BaseModelClient):
             raise ValueError("GEMINI_API_KEY environment variable is required")
         genai.configure(api_key=api_key)
         self.client = genai.GenerativeModel(model_name)
-        logger.debug(f"[{self.model_name}] Initialized Gemini client (genai.GenerativeModel)")
+        logger.debug("[%s] Initialized Gemini client (genai.GenerativeModel)", self.model_name)
 
-    async def generate_response(self, prompt: str, temperature: float = 0.0, inject_random_seed: bool = True) -> str:
+    async def generate_response(self, prompt: str, temperature: float = 0.0, inject_random_seed: bool = True, json_mode: bool = False) -> str:
         system_prompt_content = self.system_prompt
         if inject_random_seed:
             random_seed = generate_random_seed()
@@ -887,7 +1013,8 @@ class GeminiClient(BaseModelClient):
         try:
             generation_config = genai.types.GenerationConfig(
                 temperature=temperature,
-                max_output_tokens=self.max_tokens
+                max_output_tokens=self.max_tokens,
+                **({"response_mime_type": "application/json"} if json_mode else {}),
             )
             response = await self.client.generate_content_async(
                 contents=full_prompt,
@@ -910,28 +1037,32 @@ class DeepSeekClient(BaseModelClient):
     For DeepSeek R1 'deepseek-reasoner'
     """
 
+    __slots__ = ()
+
     def __init__(self, model_name: str, prompts_dir: Optional[str] = None):
         super().__init__(model_name, prompts_dir=prompts_dir)
         self.api_key = os.environ.get("DEEPSEEK_API_KEY")
-        self.client = AsyncDeepSeekOpenAI(
+        self.client = _shared_sdk_client(
+            AsyncDeepSeekOpenAI,
             api_key=self.api_key, 
             base_url="https://api.deepseek.com/"
         )
 
-    async def generate_response(self, prompt: str, temperature: float = 0.0, inject_random_seed: bool = True) -> str:
+    async def generate_response(self, prompt: str, temperature: float = 0.0, inject_random_seed: bool = True, json_mode: bool = False) -> str:
         try:
             # Append the call to action to the user's prompt
             prompt_with_cta = prompt + "\n\nPROVIDE YOUR RESPONSE BELOW:"
 
-            system_prompt_content = self.system_prompt
+            # The seeded variant differs per call; otherwise reuse the prebuilt system message
+            system_msg = self._system_msg
             if inject_random_seed:
                 random_seed = generate_random_seed()
-                system_prompt_content = f"{random_seed}\n\n{self.system_prompt}"
+                system_msg = {"role": "system", "content": f"{random_seed}\n\n{self.system_prompt}"}
 
             response = await self.client.chat.completions.create(
                 model=self.model_name,
                 messages=[
-                    {"role": "system", "content": system_prompt_content},
+                    system_msg,
                     {"role": "user", "content": prompt_with_cta},
                 ],
                 stream=False,
@@ -939,7 +1070,7 @@ class DeepSeekClient(BaseModelClient):
                 max_tokens=self.max_tokens,
             )
             
-            logger.debug(f"[{self.model_name}] Raw DeepSeek response:\n{response}")
+            logger.debug("[%s] Raw DeepSeek response:\n%s", self.model_name, response)
 
             if not response or not response.choices:
                 logger.warning(
@@ -966,15 +1097,22 @@ class OpenAIResponsesClient(BaseModelClient):
     This client makes direct HTTP requests to the v1/responses endpoint.
     """
 
+    __slots__ = ()
+
     def __init__(self, model_name: str, prompts_dir: Optional[str] = None):
         super().__init__(model_name, prompts_dir=prompts_dir)
         self.api_key = os.environ.get("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY environment variable is required")
         self.base_url = "https://api.openai.com/v1/responses"
+        # Static per client, so built once rather than on every request
+        self._headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}",
+        }
         logger.info(f"[{self.model_name}] Initialized OpenAI Responses API client")
 
-    async def generate_response(self, prompt: str, temperature: float = 0.0, inject_random_seed: bool = True) -> str:
+    async def generate_response(self, prompt: str, temperature: float = 0.0, inject_random_seed: bool = True, json_mode: bool = False) -> str:
         try:
             # The Responses API uses a different format than chat completions
             # Combine system prompt and user prompt into a single input
@@ -992,70 +1130,60 @@ class OpenAIResponsesClient(BaseModelClient):
                 "temperature": temperature,
                 "max_tokens": self.max_tokens,
             }
+            if json_mode:
+                payload["text"] = {"format": {"type": "json_object"}}
             
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}"
-            }
-            
-            # Make the API call using aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.base_url, json=payload, headers=headers) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(
-                            f"[{self.model_name}] API error (status {response.status}): {error_text}"
+            # Make the API call over the shared, pooled aiohttp session
+            session = await _get_aiohttp_session()
+            # Serialize the (prompt-sized) payload straight to bytes; Content-Type is in _headers
+            async with session.post(self.base_url, data=_fast_json_dumpb(payload), headers=self._headers) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.error(
+                        f"[{self.model_name}] API error (status {response.status}): {error_text}"
+                    )
+                    return ""
+
+                # One buffered read, decoded by orjson when available (accepts bytes directly)
+                response_data = _fast_json_loads(await response.read())
+
+                # Extract the text from the nested response structure. The
+                # assistant message always trails any reasoning items, so read
+                # the last output rather than a fixed position.
+                try:
+                    outputs = response_data.get("output") or ()
+                    if not outputs:
+                        logger.warning(
+                            f"[{self.model_name}] Unexpected output structure. Full response: {response_data}"
                         )
                         return ""
-                    
-                    response_data = await response.json()
-                    
-                    # Extract the text from the nested response structure
-                    # The text is in output[1].content[0].text based on the response
-                    try:
-                        outputs = response_data.get("output", [])
-                        if len(outputs) < 2:
-                            logger.warning(
-                                f"[{self.model_name}] Unexpected output structure. Full response: {response_data}"
-                            )
-                            return ""
-                        
-                        # The message is typically in the second output item
-                        message_output = outputs[1]
-                        if message_output.get("type") != "message":
-                            logger.warning(
-                                f"[{self.model_name}] Expected message type in output[1]. Got: {message_output.get('type')}"
-                            )
-                            return ""
-                        
-                        content_list = message_output.get("content", [])
-                        if not content_list:
-                            logger.warning(
-                                f"[{self.model_name}] Empty content list in message output"
-                            )
-                            return ""
-                        
-                        # Look for the content item with type 'output_text'
-                        text_content = ""
-                        for content_item in content_list:
-                            if content_item.get("type") == "output_text":
-                                text_content = content_item.get("text", "")
-                                break
-                        
-                        if not text_content:
-                            logger.warning(
-                                f"[{self.model_name}] No output_text found in content. Full content: {content_list}"
-                            )
-                            return ""
-                        
-                        return text_content.strip()
-                        
-                    except (KeyError, IndexError, TypeError) as e:
-                        logger.error(
-                            f"[{self.model_name}] Error parsing response structure: {e}. Full response: {response_data}"
+
+                    message_output = outputs[-1]
+                    if message_output.get("type") != "message":
+                        logger.warning(
+                            f"[{self.model_name}] Expected message type in last output. Got: {message_output.get('type')}"
                         )
                         return ""
-                    
+
+                    content_list = message_output.get("content") or ()
+                    text_content = next(
+                        (c["text"] for c in content_list if c.get("type") == "output_text"), ""
+                    )
+
+                    if not text_content:
+                        logger.warning(
+                            f"[{self.model_name}] No output_text found in content. Full content: {content_list}"
+                        )
+                        return ""
+
+                    return text_content.strip()
+
+                except (KeyError, IndexError, TypeError) as e:
+                    logger.error(
+                        f"[{self.model_name}] Error parsing response structure: {e}. Full response: {response_data}"
+                    )
+                    return ""
+
         except aiohttp.ClientError as e:
             logger.error(
                 f"[{self.model_name}] HTTP client error in generate_response: {e}"
@@ -1073,6 +1201,8 @@ class OpenRouterClient(BaseModelClient):
     For OpenRouter models, with default being 'openrouter/quasar-alpha'
     """
 
+    __slots__ = ()
+
     def __init__(self, model_name: str = "openrouter/quasar-alpha", prompts_dir: Optional[str] = None):
         # Allow specifying just the model identifier or the full path
         if not model_name.startswith("openrouter/") and "/" not in model_name:
@@ -1085,33 +1215,36 @@ class OpenRouterClient(BaseModelClient):
         if not self.api_key:
             raise ValueError("OPENROUTER_API_KEY environment variable is required")
             
-        self.client = AsyncOpenAI(
+        self.client = _shared_sdk_client(
+            AsyncOpenAI,
             base_url="https://openrouter.ai/api/v1",
             api_key=self.api_key
         )
         
-        logger.debug(f"[{self.model_name}] Initialized OpenRouter client")
+        logger.debug("[%s] Initialized OpenRouter client", self.model_name)
 
-    async def generate_response(self, prompt: str, temperature: float = 0.0, inject_random_seed: bool = True) -> str:
+    async def generate_response(self, prompt: str, temperature: float = 0.0, inject_random_seed: bool = True, json_mode: bool = False) -> str:
         """Generate a response using OpenRouter with robust error handling."""
         try:
             # Append the call to action to the user's prompt
             prompt_with_cta = prompt + "\n\nPROVIDE YOUR RESPONSE BELOW:"
 
-            system_prompt_content = self.system_prompt
+            # The seeded variant differs per call; otherwise reuse the prebuilt system message
+            system_msg = self._system_msg
             if inject_random_seed:
                 random_seed = generate_random_seed()
-                system_prompt_content = f"{random_seed}\n\n{self.system_prompt}"
+                system_msg = {"role": "system", "content": f"{random_seed}\n\n{self.system_prompt}"}
 
             # Prepare standard OpenAI-compatible request
             response = await self.client.chat.completions.create(
                 model=self.model_name,
                 messages=[
-                    {"role": "system", "content": system_prompt_content},
+                    system_msg,
                     {"role": "user", "content": prompt_with_cta}
                 ],
                 max_tokens=self.max_tokens,
                 temperature=temperature,
+                **(JSON_OBJECT_RESPONSE_FORMAT if json_mode else {}),
             )
             
             if not response.choices:
@@ -1151,6 +1284,8 @@ class TogetherAIClient(BaseModelClient):
     Model names should be passed without the 'together-' prefix.
     """
 
+    __slots__ = ()
+
     def __init__(self, model_name: str, prompts_dir: Optional[str] = None):
         super().__init__(model_name, prompts_dir=prompts_dir)  # model_name here is the actual Together AI model identifier
         self.api_key = os.environ.get("TOGETHER_API_KEY")
@@ -1159,17 +1294,23 @@ class TogetherAIClient(BaseModelClient):
         
         # The model_name passed to super() is used for logging and identification.
         # The actual model name for the API call is self.model_name (from super class).
-        self.client = AsyncTogether(api_key=self.api_key)
+        self.client = _shared_sdk_client(AsyncTogether, api_key=self.api_key)
         logger.info(f"[{self.model_name}] Initialized TogetherAI client for model: {self.model_name}")
 
-    async def generate_response(self, prompt: str) -> str:
+    async def generate_response(self, prompt: str, temperature: float = 0.0, inject_random_seed: bool = True, json_mode: bool = False) -> str:
         """
         Generates a response from the Together AI model.
         """
-        logger.debug(f"[{self.model_name}] Generating response with prompt (first 100 chars): {prompt[:100]}...")
-        
+        logger.debug("[%s] Generating response with prompt (first 100 chars): %s...", self.model_name, prompt[:100])
+
+        # The seeded variant differs per call; otherwise reuse the prebuilt system message
+        system_msg = self._system_msg
+        if inject_random_seed:
+            random_seed = generate_random_seed()
+            system_msg = {"role": "system", "content": f"{random_seed}\n\n{self.system_prompt}"}
+
         messages = [
-            {"role": "system", "content": self.system_prompt},
+            system_msg,
             {"role": "user", "content": prompt},
         ]
 
@@ -1179,13 +1320,14 @@ class TogetherAIClient(BaseModelClient):
             response = await self.client.chat.completions.create(
                 model=self.model_name,
                 messages=messages,
-                # Consider adding max_tokens, temperature, etc. as needed
+                temperature=temperature,
+                # Consider adding max_tokens, etc. as needed
                 # max_tokens=2048, # Example
             )
             
             if response.choices and response.choices[0].message and response.choices[0].message.content is not None:
                 content = response.choices[0].message.content
-                logger.debug(f"[{self.model_name}] Received response (first 100 chars): {content[:100]}...")
+                logger.debug("[%s] Received response (first 100 chars): %s...", self.model_name, content[:100])
                 return content.strip()
             else:
                 logger.warning(f"[{self.model_name}] No content in response from Together AI or response structure unexpected: {response}")
@@ -1203,6 +1345,24 @@ class TogetherAIClient(BaseModelClient):
 ##############################################################################
 
 
+# Provider dispatch for load_model_client. Each alternative is an anchored
+# lookahead, so the first provider listed wins regardless of where its marker
+# appears in the id (OpenRouter first, to handle prefixed models like
+# openrouter-deepseek and vendor/model ids).
+_PROVIDER_RE = re.compile(
+    r"(?=.*(?P<openrouter>openrouter|/))"
+    r"|(?=.*(?P<claude>claude))"
+    r"|(?=.*(?P<gemini>gemini))"
+    r"|(?=.*(?P<deepseek>deepseek))"
+)
+_PROVIDER_CLASSES = {
+    "openrouter": OpenRouterClient,
+    "claude": ClaudeClient,
+    "gemini": GeminiClient,
+    "deepseek": DeepSeekClient,
+}
+
+
 def load_model_client(model_id: str, prompts_dir: Optional[str] = None) -> BaseModelClient:
     """
     Returns the appropriate LLM client for a given model_id string.
@@ -1214,28 +1374,19 @@ def load_model_client(model_id: str, prompts_dir: Optional[str] = None) -> BaseM
     Example usage:
        client = load_model_client("claude-3-5-sonnet-20241022")
     """
-    # Basic pattern matching or direct mapping
     lower_id = model_id.lower()
-    
+
     # Check for o3-pro model specifically - it needs the Responses API
     if lower_id == "o3-pro":
         return OpenAIResponsesClient(model_id, prompts_dir=prompts_dir)
-    # Check for OpenRouter first to handle prefixed models like openrouter-deepseek
-    elif model_id.startswith("together-"):
+    if model_id.startswith("together-"):
         actual_model_name = model_id.split("together-", 1)[1]
         logger.info(f"Loading TogetherAI client for model: {actual_model_name} (original ID: {model_id})")
         return TogetherAIClient(actual_model_name, prompts_dir=prompts_dir)
-    elif "openrouter" in model_id.lower() or "/" in model_id: # More general check for OpenRouterClient(model_id)
-        return OpenRouterClient(model_id, prompts_dir=prompts_dir)
-    elif "claude" in lower_id:
-        return ClaudeClient(model_id, prompts_dir=prompts_dir)
-    elif "gemini" in lower_id:
-        return GeminiClient(model_id, prompts_dir=prompts_dir)
-    elif "deepseek" in lower_id:
-        return DeepSeekClient(model_id, prompts_dir=prompts_dir)
-    else:
-        # Default to OpenAI (for models like o3-mini, gpt-4o, etc.)
-        return OpenAIClient(model_id, prompts_dir=prompts_dir)
+    m = _PROVIDER_RE.match(lower_id)
+    # Default to OpenAI (for models like o3-mini, gpt-4o, etc.)
+    client_cls = _PROVIDER_CLASSES[m.lastgroup] if m else OpenAIClient
+    return client_cls(model_id, prompts_dir=prompts_dir)
 
 
 ##############################################################################
@@ -1245,14 +1396,9 @@ def get_visible_messages_for_power(conversation_messages, power_name):
     """
     Returns a chronological subset of conversation_messages that power_name can legitimately see.
     """
-    visible = []
-    for msg in conversation_messages:
-        # GLOBAL might be 'ALL' or 'GLOBAL' depending on your usage
-        if (
-            msg["recipient"] == "ALL"
-            or msg["recipient"] == "GLOBAL"
-            or msg["sender"] == power_name
-            or msg["recipient"] == power_name
-        ):
-            visible.append(msg)
-    return visible  # already in chronological order if appended that way
+    # GLOBAL might be 'ALL' or 'GLOBAL' depending on your usage
+    visible_recipients = frozenset(("ALL", "GLOBAL", power_name))
+    return [
+        msg for msg in conversation_messages
+        if msg["recipient"] in visible_recipients or msg["sender"] == power_name
+    ]  # already in chronological order if appended that way
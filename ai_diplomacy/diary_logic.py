@@ -1,39 +1,51 @@
 # ai_diplomacy/diary_logic.py
+import asyncio
 import logging
+import os
 import re
-from typing import TYPE_CHECKING, Optional
-
-from .utils import run_llm_and_log, log_llm_response
+from collections import deque
+from collections.abc import Iterable
+from itertools import chain
+from string import Template
+from typing import TYPE_CHECKING
+
+from .llm_cache import get_cached_llm_response, llm_cache_key, store_llm_response
+from .utils import (
+    cached_read_text,
+    log_llm_response,
+    run_llm_and_log,
+)
 
 if TYPE_CHECKING:
     from diplomacy import Game
+
     from .agent import DiplomacyAgent
+    from .game_history import GameHistory
 
 logger = logging.getLogger(__name__)
 
-def _load_prompt_file(filename: str, prompts_dir: Optional[str] = None) -> str | None:
-    """A local copy of the helper from agent.py to avoid circular imports."""
-    import os
-    try:
-        if prompts_dir:
-            filepath = os.path.join(prompts_dir, filename)
-        else:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            default_prompts_dir = os.path.join(current_dir, 'prompts')
-            filepath = os.path.join(default_prompts_dir, filename)
+# Diary entries are always written as "[<PHASE>] text" (e.g. "[S1901M] ..."),
+# so the year can be read with an anchored match instead of a full-text search.
+_RE_ENTRY_YEAR = re.compile(r"\[[SFWRAB]\s*(\d{4})")
+
 
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return f.read()
-    except Exception as e:
-        logger.error(f"Error loading prompt file {filepath}: {e}")
-        return None
+def _entry_year(entry: str) -> int | None:
+    m = _RE_ENTRY_YEAR.match(entry)
+    return int(m.group(1)) if m else None
+
+_PROMPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts")
+
+def _load_prompt_file(filename: str, prompts_dir: str | None = None) -> str | None:
+    """A local copy of the helper from agent.py to avoid circular imports."""
+    filepath = os.path.join(prompts_dir or _PROMPTS_DIR, filename)
+    return cached_read_text(os.path.abspath(filepath))
 
 async def run_diary_consolidation(
     agent: 'DiplomacyAgent',
     game: "Game",
     log_file_path: str,
     entries_to_keep_unsummarized: int = 15,
-    prompts_dir: Optional[str] = None,
+    prompts_dir: str | None = None,
 ):
     """
     Consolidate older diary entries while keeping recent ones.
@@ -50,7 +62,7 @@ async def run_diary_consolidation(
     ]
 
     if len(full_entries) <= entries_to_keep_unsummarized:
-        agent.private_diary = list(agent.full_private_diary)
+        agent.private_diary = deque(agent.full_private_diary, maxlen=agent.private_diary.maxlen)
         logger.info(
             f"[{agent.power_name}] ≤ {entries_to_keep_unsummarized} full entries — "
             "skipping consolidation"
@@ -58,32 +70,28 @@ async def run_diary_consolidation(
         return
 
     boundary_entry = full_entries[-entries_to_keep_unsummarized]
-    match = re.search(r"\[[SFWRAB]\s*(\d{4})", boundary_entry)
-    if not match:
+    cutoff_year = _entry_year(boundary_entry)
+    if cutoff_year is None:
         logger.error(
             f"[{agent.power_name}] Could not parse year from boundary entry; "
             "aborting consolidation"
         )
-        agent.private_diary = list(agent.full_private_diary)
+        agent.private_diary = deque(agent.full_private_diary, maxlen=agent.private_diary.maxlen)
         return
 
-    cutoff_year = int(match.group(1))
     logger.info(
         f"[{agent.power_name}] Cut-off year for consolidation: {cutoff_year}"
     )
 
-    def _entry_year(entry: str) -> int | None:
-        m = re.search(r"\[[SFWRAB]\s*(\d{4})", entry)
-        return int(m.group(1)) if m else None
-
-    entries_to_summarize = [
-        e for e in full_entries
-        if (_entry_year(e) is not None and _entry_year(e) < cutoff_year)
-    ]
-    entries_to_keep = [
-        e for e in full_entries
-        if (_entry_year(e) is None or _entry_year(e) >= cutoff_year)
-    ]
+    # Single pass: parse each entry's year once and partition on it
+    entries_to_summarize = []
+    entries_to_keep = []
+    for e in full_entries:
+        year = _entry_year(e)
+        if year is not None and year < cutoff_year:
+            entries_to_summarize.append(e)
+        else:
+            entries_to_keep.append(e)
 
     logger.info(
         f"[{agent.power_name}] Summarising {len(entries_to_summarize)} entries; "
@@ -91,7 +99,7 @@ async def run_diary_consolidation(
     )
 
     if not entries_to_summarize:
-        agent.private_diary = list(agent.full_private_diary)
+        agent.private_diary = deque(agent.full_private_diary, maxlen=agent.private_diary.maxlen)
         logger.warning(
             f"[{agent.power_name}] No eligible entries to summarise; "
             "context diary left unchanged"
@@ -105,54 +113,140 @@ async def run_diary_consolidation(
         )
         return
 
-    prompt = prompt_template.format(
+    prompt = Template(prompt_template).safe_substitute(
         power_name=agent.power_name,
         full_diary_text="\n\n".join(entries_to_summarize),
     )
 
     raw_response = ""
     success_flag = "FALSE"
-    consolidation_client = None
+    # Consolidation reuses the agent's own client (and its connection pool)
+    # rather than constructing a dedicated one per call.
+    consolidation_client = agent.client
     try:
-        consolidation_client = agent.client
-
-        raw_response = await run_llm_and_log(
-            client=consolidation_client,
-            prompt=prompt,
-            log_file_path=log_file_path,
-            power_name=agent.power_name,
-            phase=game.current_short_phase,
-            response_type="diary_consolidation",
+        cache_key = llm_cache_key(
+            consolidation_client.model_name, prompt,
+            namespace=f"diary_consolidation:{agent.power_name}:{game.current_short_phase}",
         )
+        cached_response = await get_cached_llm_response(cache_key)
+        if cached_response is not None:
+            logger.info(f"[{agent.power_name}] Using cached diary consolidation response")
+            raw_response = cached_response
+        else:
+            raw_response = await run_llm_and_log(
+                client=consolidation_client,
+                prompt=prompt,
+                log_file_path=log_file_path,
+                power_name=agent.power_name,
+                phase=game.current_short_phase,
+                response_type="diary_consolidation",
+            )
 
         consolidated_text = raw_response.strip() if raw_response else ""
         if not consolidated_text:
             raise ValueError("LLM returned empty summary")
+        if cached_response is None:
+            await store_llm_response(cache_key, raw_response)
 
         new_summary_entry = f"[CONSOLIDATED HISTORY] {consolidated_text}"
-        agent.private_diary = [new_summary_entry] + entries_to_keep
+        maxlen = agent.private_diary.maxlen
+        if maxlen is not None and len(entries_to_keep) >= maxlen:
+            # Trim the kept entries, not the summary, to fit the bounded deque
+            entries_to_keep = entries_to_keep[len(entries_to_keep) - maxlen + 1:]
+        agent.private_diary = deque(chain((new_summary_entry,), entries_to_keep), maxlen=maxlen)
         success_flag = "TRUE"
         logger.info(
             f"[{agent.power_name}] Consolidation complete — "
             f"{len(agent.private_diary)} context entries now"
         )
 
-    except Exception as exc:
-        logger.error(
-            f"[{agent.power_name}] Diary consolidation failed: {exc}", exc_info=True
-        )
+    except Exception:
+        logger.exception(f"[{agent.power_name}] Diary consolidation failed")
     finally:
         log_llm_response(
             log_file_path=log_file_path,
-            model_name=(
-                consolidation_client.model_name
-                if consolidation_client is not None
-                else agent.client.model_name
-            ),
+            model_name=consolidation_client.model_name,
             power_name=agent.power_name,
             phase=game.current_short_phase,
             response_type="diary_consolidation",
             raw_input_prompt=prompt,
             raw_response=raw_response,
             success=success_flag,
-        )
\ No newline at end of file
+        )
+
+
+async def _gather_bounded(coros_factory, items: Iterable, concurrency: int) -> list:
+    """Runs coros_factory(item) for every item, at most `concurrency` at a time."""
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _run(item):
+        async with sem:
+            return await coros_factory(item)
+
+    return await asyncio.gather(*(_run(i) for i in items), return_exceptions=True)
+
+
+async def consolidate_all(
+    agents: Iterable['DiplomacyAgent'],
+    game: "Game",
+    log_file_path: str,
+    prompts_dir: str | None = None,
+    concurrency: int = 7,
+) -> list:
+    """
+    Runs diary consolidation for several agents concurrently. Each consolidation
+    is an independent LLM round-trip, so wall-clock is ~max(latency), not the sum.
+    """
+    return await _gather_bounded(
+        lambda agent: run_diary_consolidation(agent, game, log_file_path, prompts_dir=prompts_dir),
+        agents,
+        concurrency,
+    )
+
+
+async def negotiation_diary_all(
+    agents: Iterable['DiplomacyAgent'],
+    game: "Game",
+    game_history: 'GameHistory',
+    log_file_path: str,
+    concurrency: int = 7,
+) -> list:
+    """Generates the post-negotiation diary entry for several agents concurrently."""
+    return await _gather_bounded(
+        lambda agent: agent.generate_negotiation_diary_entry(game, game_history, log_file_path),
+        agents,
+        concurrency,
+    )
+
+
+async def order_diary_all(
+    agent_orders: Iterable[tuple['DiplomacyAgent', list[str]]],
+    game: "Game",
+    log_file_path: str,
+    concurrency: int = 7,
+) -> list:
+    """Generates the order diary entry for each (agent, orders) pair concurrently."""
+    return await _gather_bounded(
+        lambda pair: pair[0].generate_order_diary_entry(game, pair[1], log_file_path),
+        agent_orders,
+        concurrency,
+    )
+
+
+async def phase_result_diary_all(
+    agents: Iterable['DiplomacyAgent'],
+    game: "Game",
+    game_history: 'GameHistory',
+    phase_summary: str,
+    all_orders: dict[str, list[str]],
+    log_file_path: str,
+    concurrency: int = 7,
+) -> list:
+    """Generates the post-adjudication diary entry for several agents concurrently."""
+    return await _gather_bounded(
+        lambda agent: agent.generate_phase_result_diary_entry(
+            game, game_history, phase_summary, all_orders, log_file_path
+        ),
+        agents,
+        concurrency,
+    )
@@ -307,61 +307,64 @@ class GameHistory:
         if not phases_to_report:
             return "\n(No previous game history available within the lookback window)\n"
         
-        game_history_str = ""
+        # Collect fragments and join once; the history grows with every phase.
+        history_header = "**PREVIOUS GAME HISTORY (Messages, Orders, & Plans from older rounds & phases)**\n"
+        parts: list[str] = []
 
         for phase_idx, phase in enumerate(phases_to_report):
-            phase_content_str = f"\nPHASE: {phase.name}\n"
+            phase_parts = [f"\nPHASE: {phase.name}\n"]
             current_phase_has_content = False
 
             global_msgs = phase.get_global_messages()
             if global_msgs:
-                phase_content_str += "\n  GLOBAL MESSAGES:\n"
-                phase_content_str += "".join([f"    {line}\n" for line in global_msgs.strip().split('\n')])
+                phase_parts.append("\n  GLOBAL MESSAGES:\n")
+                phase_parts.extend(f"    {line}\n" for line in global_msgs.strip().split('\n'))
                 current_phase_has_content = True
 
             private_msgs = phase.get_private_messages(power_name)
             if private_msgs:
-                phase_content_str += "\n  PRIVATE MESSAGES:\n"
+                phase_parts.append("\n  PRIVATE MESSAGES:\n")
                 for other_power, messages in private_msgs.items():
-                    phase_content_str += f"    Conversation with {other_power}:\n"
-                    phase_content_str += "".join([f"      {line}\n" for line in messages.strip().split('\n')])
+                    phase_parts.append(f"    Conversation with {other_power}:\n")
+                    phase_parts.extend(f"      {line}\n" for line in messages.strip().split('\n'))
                 current_phase_has_content = True
 
             if phase.orders_by_power:
-                phase_content_str += "\n  ORDERS:\n"
+                phase_parts.append("\n  ORDERS:\n")
                 for power, orders in phase.orders_by_power.items():
                     indicator = " (your power)" if power == power_name else ""
-                    phase_content_str += f"    {power}{indicator}:\n"
+                    phase_parts.append(f"    {power}{indicator}:\n")
                     results = phase.results_by_power.get(power, [])
                     for i, order in enumerate(orders):
                         result_str = " (successful)"
                         if i < len(results) and results[i] and not all(r == "" for r in results[i]):
                             result_str = f" ({', '.join(results[i])})"
-                        phase_content_str += f"      {order}{result_str}\n"
-                    phase_content_str += "\n"
+                        phase_parts.append(f"      {order}{result_str}\n")
+                    phase_parts.append("\n")
                 current_phase_has_content = True
             
             if current_phase_has_content:
-                if not game_history_str:
-                    game_history_str = "**PREVIOUS GAME HISTORY (Messages, Orders, & Plans from older rounds & phases)**\n"
-                game_history_str += phase_content_str
+                if not parts:
+                    parts.append(history_header)
+                parts.extend(phase_parts)
                 if phase_idx < len(phases_to_report) -1 :
-                    game_history_str += "  " + "-" * 48 + "\n"
+                    parts.append("  " + "-" * 48 + "\n")
 
         if include_plans and phases_to_report:
             last_reported_previous_phase = phases_to_report[-1]
             if last_reported_previous_phase.plans:
-                if not game_history_str:
-                    game_history_str = "**PREVIOUS GAME HISTORY (Messages, Orders, & Plans from older rounds & phases)**\n"
-                game_history_str += f"\n  PLANS SUBMITTED FOR PHASE {last_reported_previous_phase.name}:\n"
+                if not parts:
+                    parts.append(history_header)
+                parts.append(f"\n  PLANS SUBMITTED FOR PHASE {last_reported_previous_phase.name}:\n")
                 if power_name in last_reported_previous_phase.plans:
-                    game_history_str += f"    Your Plan: {last_reported_previous_phase.plans[power_name]}\n"
+                    parts.append(f"    Your Plan: {last_reported_previous_phase.plans[power_name]}\n")
                 for p_other, plan_other in last_reported_previous_phase.plans.items():
                     if p_other != power_name:
-                        game_history_str += f"    {p_other}'s Plan: {plan_other}\n"
-                game_history_str += "\n"
+                        parts.append(f"    {p_other}'s Plan: {plan_other}\n")
+                parts.append("\n")
 
-        if not game_history_str.replace("**PREVIOUS GAME HISTORY (Messages, Orders, & Plans from older rounds & phases)**\n", "").strip():
+        game_history_str = "".join(parts)
+        if not game_history_str.replace(history_header, "").strip():
             return "\n(No relevant previous game history to display)\n"
 
         return game_history_str.strip()
@@ -3,6 +3,7 @@ import logging
 import os
 import json
 import asyncio
+from collections import deque
 from typing import Dict, List, Tuple, Optional, Any
 from argparse import Namespace
 
@@ -28,7 +29,7 @@ def serialize_agent(agent: DiplomacyAgent) -> dict:
         "goals": agent.goals,
         "relationships": agent.relationships,
         "full_private_diary": agent.full_private_diary,
-        "private_diary": agent.private_diary,
+        "private_diary": list(agent.private_diary),
     }
 
 def deserialize_agent(agent_data: dict, prompts_dir: Optional[str] = None) -> DiplomacyAgent:
@@ -45,7 +46,7 @@ def deserialize_agent(agent_data: dict, prompts_dir: Optional[str] = None) -> Di
     )
     # Restore the diary.
     agent.full_private_diary = agent_data.get("full_private_diary", [])
-    agent.private_diary = agent_data.get("private_diary", [])
+    agent.private_diary = deque(agent_data.get("private_diary", []), maxlen=agent.private_diary.maxlen)
     
     return agent
 
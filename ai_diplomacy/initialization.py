@@ -9,7 +9,7 @@ if False: # TYPE_CHECKING
     from diplomacy.models.game import GameHistory
     from .agent import DiplomacyAgent
 
-from .agent import ALL_POWERS, ALLOWED_RELATIONSHIPS
+from .agent import ALL_POWERS, ALLOWED_RELATIONSHIPS, ALLOWED_RELATIONSHIPS_SET, order_relationships
 from .utils import run_llm_and_log, log_llm_response
 from .prompt_constructor import build_context_prompt
 
@@ -120,12 +120,12 @@ async def initialize_agent_state_ext(
                     p_upper = str(p_key).upper()
                     r_title = str(r_val).title() if isinstance(r_val, str) else str(r_val)
                     if p_upper in ALL_POWERS and p_upper != power_name:
-                        if r_title in ALLOWED_RELATIONSHIPS:
+                        if r_title in ALLOWED_RELATIONSHIPS_SET:
                             valid_relationships[p_upper] = r_title
                         else:
                             valid_relationships[p_upper] = "Neutral"
                 if valid_relationships:
-                    agent.relationships = valid_relationships
+                    agent.relationships = order_relationships(valid_relationships)
                     agent.add_journal_entry(f"[{current_phase}] Initial Relationships Set by LLM: {agent.relationships}")
                     logger.info(f"[{power_name}] Relationships updated from LLM: {agent.relationships}")
                     initial_relationships_applied = True
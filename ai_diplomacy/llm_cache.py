@@ -0,0 +1,132 @@
+# ai_diplomacy/llm_cache.py
+"""
+Optional prompt-hash -> response cache for deterministic LLM calls.
+
+Enabled with DIPLOMACY_LLM_CACHE=1. Responses persist in a SQLite database in WAL
+mode under DIPLOMACY_LLM_CACHE_DIR (default data/cache), so parallel lm_game
+processes (e.g. from experiment_runner.py) can read and write the same cache
+safely. Each repeat of a prompt within a namespace gets its own sample slot, so
+replays reuse the original run's responses one-for-one instead of collapsing
+repeated calls onto a single answer.
+"""
+import asyncio
+import atexit
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_ENABLED = os.getenv("DIPLOMACY_LLM_CACHE") == "1"
+LLM_CACHE_DIR = os.getenv("DIPLOMACY_LLM_CACHE_DIR", os.path.join("data", "cache"))
+LLM_CACHE_FILENAME = "llm_responses.sqlite3"
+
+# In-process front for the database
+_llm_response_cache: dict[str, str] = {}
+# How many times each (model, namespace, prompt) hash has been requested in this process
+_llm_sample_counters: dict[str, int] = {}
+
+# One connection per process, opened on first use and shared by the worker
+# threads the async helpers run on; the lock serializes access to it.
+_conn: sqlite3.Connection | None = None
+_conn_failed = False
+_conn_lock = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection | None:
+    """Opens (once) the cache database. Returns None if it cannot be opened."""
+    global _conn, _conn_failed
+    if _conn is not None or _conn_failed:
+        return _conn
+    try:
+        os.makedirs(LLM_CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(
+            os.path.join(LLM_CACHE_DIR, LLM_CACHE_FILENAME),
+            timeout=30,
+            isolation_level=None,  # autocommit: each write is its own short transaction
+            check_same_thread=False,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL)"
+        )
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Could not open LLM response cache in {LLM_CACHE_DIR}: {e}. Cache disabled.")
+        _conn_failed = True
+        return None
+    _conn = conn
+    return _conn
+
+
+def _read(key: str) -> str | None:
+    with _conn_lock:
+        conn = _connect()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read LLM response cache: {e}")
+            return None
+    return row[0] if row else None
+
+
+def _write(key: str, response: str):
+    with _conn_lock:
+        conn = _connect()
+        if conn is None:
+            return
+        try:
+            # The first process to fill a sample slot wins; later writers keep its answer
+            conn.execute(
+                "INSERT OR IGNORE INTO responses (key, response) VALUES (?, ?)", (key, response)
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write LLM response cache: {e}")
+
+
+def llm_cache_key(model_name: str, prompt: str, namespace: str = "") -> str | None:
+    """
+    Returns the cache key for the next sample of a model/prompt pair in `namespace`,
+    or None when the cache is disabled (no hashing or bookkeeping is done then).
+    """
+    if not LLM_CACHE_ENABLED:
+        return None
+    base = hashlib.sha256(f"{model_name}|{namespace}|{prompt}".encode()).hexdigest()
+    sample_idx = _llm_sample_counters.get(base, 0)
+    _llm_sample_counters[base] = sample_idx + 1
+    return f"{base}:{sample_idx}"
+
+
+async def get_cached_llm_response(key: str | None) -> str | None:
+    """Looks up a cached LLM response (memory first, then disk). Returns None on a miss."""
+    if key is None:
+        return None
+    response = _llm_response_cache.get(key)
+    if response is not None:
+        return response
+    response = await asyncio.to_thread(_read, key)
+    if response is not None:
+        _llm_response_cache[key] = response
+    return response
+
+
+async def store_llm_response(key: str | None, response: str):
+    """Stores a successful LLM response in the memory and disk caches."""
+    if key is None:
+        return
+    _llm_response_cache[key] = response
+    await asyncio.to_thread(_write, key, response)
+
+
+@atexit.register
+def close_llm_cache():
+    """Closes the cache database, if it was opened."""
+    global _conn
+    with _conn_lock:
+        if _conn is not None:
+            _conn.close()
+            _conn = None
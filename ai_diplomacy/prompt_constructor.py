@@ -14,6 +14,30 @@ from .game_history import GameHistory # Assuming GameHistory is correctly import
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG) # Or inherit from parent logger
 
+# Rich order context per (phase, power, board, possible orders). Orders, conversation and
+# planning prompts for a power all rebuild the same context within a phase; the board
+# only changes when the phase is processed, so entries are dropped once the phase moves on.
+_rich_order_context_cache: dict[tuple, str] = {}
+_rich_order_context_phase: str | None = None
+
+
+def _cached_rich_order_context(game: Any, board_state: dict, power_name: str, possible_orders: dict[str, list[str]]) -> str:
+    global _rich_order_context_phase
+    phase = board_state["phase"]
+    if phase != _rich_order_context_phase:
+        _rich_order_context_cache.clear()
+        _rich_order_context_phase = phase
+    key = (
+        power_name,
+        tuple((p, tuple(u)) for p, u in board_state["units"].items()),
+        tuple((p, tuple(c)) for p, c in board_state["centers"].items()),
+        tuple((loc, tuple(orders)) for loc, orders in possible_orders.items()),
+    )
+    context = _rich_order_context_cache.get(key)
+    if context is None:
+        context = _rich_order_context_cache[key] = generate_rich_order_context(game, power_name, possible_orders)
+    return context
+
 def build_context_prompt(
     game: Any, # diplomacy.Game object
     board_state: dict,
@@ -59,7 +83,7 @@ def build_context_prompt(
     # Get the current phase
     year_phase = board_state["phase"]  # e.g. 'S1901M'
 
-    possible_orders_context_str = generate_rich_order_context(game, power_name, possible_orders)
+    possible_orders_context_str = _cached_rich_order_context(game, board_state, power_name, possible_orders)
 
     messages_this_round_text = game_history.get_messages_this_round(
         power_name=power_name,
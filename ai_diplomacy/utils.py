@@ -1,6 +1,10 @@
 from dotenv import load_dotenv
+import asyncio
+import atexit
 import logging
 import os
+import queue
+import threading
 from typing import Dict, List, Tuple, Set, Optional
 from diplomacy import Game
 import csv
@@ -8,6 +12,7 @@ from typing import TYPE_CHECKING
 import random
 import string
 import json
+from functools import lru_cache
 
 # Avoid circular import for type hinting
 if TYPE_CHECKING:
@@ -21,7 +26,6 @@ logging.basicConfig(level=logging.INFO)
 
 load_dotenv()
 
-
 def atomic_write_json(data: dict, filepath: str):
     """Writes a dictionary to a JSON file atomically."""
     try:
@@ -292,36 +296,48 @@ def normalize_and_compare_orders(
     return orders_not_accepted, orders_not_issued
 
 
+@lru_cache(maxsize=128)
+def cached_read_text(filepath: str) -> str | None:
+    """
+    Reads a (static) prompt file once per process and caches its contents.
+    Callers should pass an absolute path so the cache key is unambiguous.
+    Returns None if the file cannot be read.
+    """
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        logger.error(f"Prompt file not found: {filepath}")
+        return None
+    except (OSError, UnicodeDecodeError) as e:
+        logger.error(f"Error loading prompt file {filepath}: {e}")
+        return None
+
+
 # Helper to load prompt text from file relative to the expected 'prompts' dir
 def load_prompt(filename: str, prompts_dir: Optional[str] = None) -> str:
-    """Helper to load prompt text from file"""
+    """Helper to load prompt text from file (read once per process via cached_read_text)"""
     if prompts_dir:
         prompt_path = os.path.join(prompts_dir, filename)
     else:
         # Default behavior: relative to this file's location in the 'prompts' subdir
         prompt_path = os.path.join(os.path.dirname(__file__), 'prompts', filename)
     
-    try:
-        with open(prompt_path, "r", encoding='utf-8') as f: # Added encoding
-            return f.read().strip()
-    except FileNotFoundError:
-        logger.error(f"Prompt file not found: {prompt_path}")
-        # Return an empty string or raise an error, depending on desired handling
-        return ""
+    text = cached_read_text(os.path.abspath(prompt_path))
+    # Missing files are logged by cached_read_text; callers expect an empty string
+    return text.strip() if text is not None else ""
 
 
 # == New LLM Response Logging Function ==
-def log_llm_response(
-    log_file_path: str,
-    model_name: str,
-    power_name: Optional[str], # Optional for non-power-specific calls like summary
-    phase: str,
-    response_type: str,
-    raw_input_prompt: str, # Added new parameter for the raw input
-    raw_response: str,
-    success: str,  # Changed from bool to str
-):
-    """Appends a raw LLM response to a CSV log file."""
+_LLM_LOG_FIELDNAMES = ["model", "power", "phase", "response_type", "raw_input", "raw_response", "success"]
+# Rows logged from inside the event loop are handed to a single writer thread so
+# concurrent coroutines never block on the CSV file. The thread is started lazily.
+_llm_log_queue: "queue.Queue[tuple[str, dict] | None]" = queue.Queue()
+_llm_log_thread: threading.Thread | None = None
+_llm_log_thread_lock = threading.Lock()
+
+
+def _write_llm_log_row(log_file_path: str, row: dict):
     try:
         # Ensure the directory exists
         log_dir = os.path.dirname(log_file_path)
@@ -332,26 +348,96 @@ def log_llm_response(
         file_exists = os.path.isfile(log_file_path)
 
         with open(log_file_path, "a", newline="", encoding="utf-8") as csvfile:
-            # Added "raw_input" to fieldnames
-            fieldnames = ["model", "power", "phase", "response_type", "raw_input", "raw_response", "success"]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer = csv.DictWriter(csvfile, fieldnames=_LLM_LOG_FIELDNAMES)
 
             if not file_exists:
                 writer.writeheader()  # Write header only if file is new
 
-            writer.writerow({
-                "model": model_name,
-                "power": power_name if power_name else "game", # Use 'game' if no specific power
-                "phase": phase,
-                "response_type": response_type,
-                "raw_input": raw_input_prompt, # Added raw_input to the row
-                "raw_response": raw_response,
-                "success": success,
-            })
+            writer.writerow(row)
     except Exception as e:
         logger.error(f"Failed to log LLM response to {log_file_path}: {e}", exc_info=True)
 
 
+def _llm_log_worker():
+    while True:
+        item = _llm_log_queue.get()
+        try:
+            if item is None:
+                return
+            _write_llm_log_row(*item)
+        finally:
+            _llm_log_queue.task_done()
+
+
+def _ensure_llm_log_thread():
+    global _llm_log_thread
+    with _llm_log_thread_lock:
+        if _llm_log_thread is None or not _llm_log_thread.is_alive():
+            _llm_log_thread = threading.Thread(target=_llm_log_worker, name="llm-csv-log", daemon=True)
+            _llm_log_thread.start()
+
+
+def flush_llm_log():
+    """Blocks until every queued LLM log row has been written."""
+    if _llm_log_thread is not None:
+        _llm_log_queue.join()
+
+
+atexit.register(flush_llm_log)
+
+
+def log_llm_response(
+    log_file_path: str,
+    model_name: str,
+    power_name: str | None, # Optional for non-power-specific calls like summary
+    phase: str,
+    response_type: str,
+    raw_input_prompt: str, # Added new parameter for the raw input
+    raw_response: str,
+    success: str,  # Changed from bool to str
+):
+    """
+    Appends a raw LLM response to a CSV log file. When called from a running event
+    loop the write is queued to a background thread; otherwise it happens inline.
+    """
+    row = {
+        "model": model_name,
+        "power": power_name if power_name else "game", # Use 'game' if no specific power
+        "phase": phase,
+        "response_type": response_type,
+        "raw_input": raw_input_prompt, # Added raw_input to the row
+        "raw_response": raw_response,
+        "success": success,
+    }
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        _write_llm_log_row(log_file_path, row)
+        return
+    _ensure_llm_log_thread()
+    _llm_log_queue.put((log_file_path, row))
+
+
+# Cap on in-flight requests per provider (client class), so gathering every
+# power's calls at once doesn't trip provider rate limits and retry storms.
+LLM_CONCURRENCY_PER_PROVIDER = int(os.getenv("DIPLOMACY_LLM_CONCURRENCY") or 8)
+_provider_semaphores: dict[tuple[int, str], asyncio.Semaphore] = {}
+
+
+def _provider_semaphore(client: 'BaseModelClient') -> asyncio.Semaphore:
+    # Keyed by event loop too: asyncio primitives are bound to the loop they first wait on.
+    key = (id(asyncio.get_running_loop()), type(client).__name__)
+    sem = _provider_semaphores.get(key)
+    if sem is None:
+        sem = _provider_semaphores[key] = asyncio.Semaphore(LLM_CONCURRENCY_PER_PROVIDER)
+    return sem
+
+
+# Per-attempt timeout (seconds) for latency-sensitive calls such as orders and
+# negotiation messages; a hung request is abandoned and retried with backoff.
+LLM_REQUEST_TIMEOUT = float(os.getenv("DIPLOMACY_LLM_TIMEOUT") or 300)
+
+
 # == New Async LLM Wrapper with Logging ==
 async def run_llm_and_log(
     client: 'BaseModelClient',
@@ -361,15 +447,38 @@ async def run_llm_and_log(
     phase: str, # Kept for context, but not used for logging here
     response_type: str, # Kept for context, but not used for logging here
     temperature: float = 0.0,
+    json_mode: bool = False,
+    timeout: float | None = None,
+    max_attempts: int = 1,
 ) -> str:
-    """Calls the client's generate_response and returns the raw output. Logging is handled by the caller."""
+    """
+    Calls the client's generate_response and returns the raw output. Logging is handled by the caller.
+    At most DIPLOMACY_LLM_CONCURRENCY calls per provider are in flight at once.
+    json_mode asks clients that support structured output for a JSON object response.
+    With a timeout, each attempt is cut off after `timeout` seconds and retried up to
+    `max_attempts` times with exponential backoff (1s, 2s, ...) outside the semaphore.
+    """
     raw_response = "" # Initialize in case of error
-    try:
-        raw_response = await client.generate_response(prompt, temperature=temperature)
-    except Exception as e:
-        # Log the API call error. The caller will decide how to log this in llm_responses.csv
-        logger.error(f"API Error during LLM call for {client.model_name}/{power_name}/{response_type} in phase {phase}: {e}", exc_info=True)
-        # raw_response remains "" indicating failure to the caller
+    call_kwargs = {"temperature": temperature}
+    if json_mode:
+        call_kwargs["json_mode"] = True
+    for attempt in range(1, max_attempts + 1):
+        try:
+            async with _provider_semaphore(client):
+                raw_response = await asyncio.wait_for(client.generate_response(prompt, **call_kwargs), timeout)
+            break
+        except TimeoutError:
+            logger.warning(
+                "LLM call for %s/%s/%s in phase %s timed out after %ss (attempt %d/%d)",
+                client.model_name, power_name, response_type, phase, timeout, attempt, max_attempts,
+            )
+            if attempt < max_attempts:
+                await asyncio.sleep(2 ** (attempt - 1))
+        except Exception:
+            # Log the API call error. The caller will decide how to log this in llm_responses.csv
+            logger.exception(f"API Error during LLM call for {client.model_name}/{power_name}/{response_type} in phase {phase}")
+            # raw_response remains "" indicating failure to the caller
+            break
     return raw_response
 
 # This generates a few lines of random alphanum chars to inject into the 
@@ -19,18 +19,24 @@ os.environ["GRPC_POLL_STRATEGY"] = "poll"  # Use 'poll' for macOS compatibility
 
 from diplomacy import Game
 
-from ai_diplomacy.utils import get_valid_orders, gather_possible_orders
+from ai_diplomacy.utils import get_valid_orders, gather_possible_orders, flush_llm_log
 from ai_diplomacy.negotiations import conduct_negotiations
 from ai_diplomacy.planning import planning_phase
 from ai_diplomacy.game_history import GameHistory
 from ai_diplomacy.agent import DiplomacyAgent
+from ai_diplomacy.clients import close_http_sessions
 import ai_diplomacy.narrative
 from ai_diplomacy.game_logic import (
     save_game_state,
     load_game_state,
     initialize_new_game,
 )
-from ai_diplomacy.diary_logic import run_diary_consolidation
+from ai_diplomacy.diary_logic import (
+    consolidate_all,
+    negotiation_diary_all,
+    order_diary_all,
+    phase_result_diary_all,
+)
 
 dotenv.load_dotenv()
 
@@ -250,17 +256,16 @@ async def main():
                     game, agents, game_history, model_error_stats, log_file_path=llm_log_file_path,
                 )
             
-            neg_diary_tasks = [
-                agent.generate_negotiation_diary_entry(game, game_history, llm_log_file_path)
-                for agent in agents.values() if not game.powers[agent.power_name].is_eliminated()
-            ]
-            if neg_diary_tasks:
-                await asyncio.gather(*neg_diary_tasks, return_exceptions=True)
+            await negotiation_diary_all(
+                [agent for agent in agents.values() if not game.powers[agent.power_name].is_eliminated()],
+                game, game_history, llm_log_file_path,
+            )
 
         # --- 4c. Order Generation ---
         logger.info("Getting orders from agents...")
         board_state = game.get_state()
         order_tasks = []
+        order_power_names = []
         for power_name, agent in agents.items():
             if not game.powers[power_name].is_eliminated():
                 possible_orders = gather_possible_orders(game, power_name)
@@ -268,6 +273,7 @@ async def main():
                     game.set_orders(power_name, [])
                     continue
                 
+                order_power_names.append(power_name)
                 order_tasks.append(
                     get_valid_orders(
                         game, agent.client, board_state, power_name, possible_orders,
@@ -278,11 +284,11 @@ async def main():
                     )
                 )
         
+        # All powers' order calls are in flight together; the per-provider semaphore
+        # in run_llm_and_log keeps each provider within its rate limits.
         order_results = await asyncio.gather(*order_tasks, return_exceptions=True)
-        
-        active_powers = [p for p, a in agents.items() if not game.powers[p].is_eliminated()]
-        order_power_names = [p for p in active_powers if gather_possible_orders(game, p)]
 
+        order_diary_pairs = []
         for i, result in enumerate(order_results):
             p_name = order_power_names[i]
             if isinstance(result, Exception):
@@ -292,7 +298,9 @@ async def main():
                 orders = result
                 game.set_orders(p_name, orders)
                 if orders:
-                    await agents[p_name].generate_order_diary_entry(game, orders, llm_log_file_path)
+                    order_diary_pairs.append((agents[p_name], orders))
+        if order_diary_pairs:
+            await order_diary_all(order_diary_pairs, game, llm_log_file_path)
 
         # --- 4d. Process Phase ---
         completed_phase = current_phase
@@ -306,21 +314,17 @@ async def main():
         all_orders_this_phase = game.order_history.get(current_short_phase, {})
         
         # Phase Result Diary Entries
-        phase_result_diary_tasks = [
-            agent.generate_phase_result_diary_entry(game, game_history, phase_summary, all_orders_this_phase, llm_log_file_path)
-            for agent in agents.values() if not game.powers[agent.power_name].is_eliminated()
-        ]
-        if phase_result_diary_tasks:
-            await asyncio.gather(*phase_result_diary_tasks, return_exceptions=True)
+        await phase_result_diary_all(
+            [agent for agent in agents.values() if not game.powers[agent.power_name].is_eliminated()],
+            game, game_history, phase_summary, all_orders_this_phase, llm_log_file_path,
+        )
 
         # Diary Consolidation
         if current_short_phase.startswith("S") and current_short_phase.endswith("M"):
-            consolidation_tasks = [
-                run_diary_consolidation(agent, game, llm_log_file_path, prompts_dir=run_config.prompts_dir)
-                for agent in agents.values() if not game.powers[agent.power_name].is_eliminated()
-            ]
-            if consolidation_tasks:
-                await asyncio.gather(*consolidation_tasks, return_exceptions=True)
+            await consolidate_all(
+                [agent for agent in agents.values() if not game.powers[agent.power_name].is_eliminated()],
+                game, llm_log_file_path, prompts_dir=run_config.prompts_dir,
+            )
 
         # Agent State Updates
         current_board_state = game.get_state()
@@ -336,6 +340,8 @@ async def main():
         logger.info(f"Phase {current_phase} took {time.time() - phase_start:.2f}s")
 
     # --- 5. Game End ---
+    flush_llm_log()
+    await close_http_sessions()
     total_time = time.time() - start_whole
     logger.info(f"Game ended after {total_time:.2f}s. Final state saved in {run_dir}")
 
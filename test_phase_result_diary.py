@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Test that the phase-result diary sees the negotiations of the phase just processed."""
+
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ai_diplomacy.agent import DiplomacyAgent
+from ai_diplomacy.game_history import GameHistory
+from diplomacy import Game
+
+
+class StubDiaryClient:
+    """Minimal stand-in for a BaseModelClient that records the prompts it receives."""
+
+    model_name = "stub-model"
+
+    def __init__(self):
+        self.prompts = []
+
+    def set_system_prompt(self, content):
+        pass
+
+    async def generate_response(self, prompt, temperature=0.0, inject_random_seed=True, json_mode=False):
+        self.prompts.append(prompt)
+        return "Diary text"
+
+
+def test_phase_result_diary_after_process(tmp_path, caplog):
+    game = Game()
+    game_history = GameHistory()
+    completed_phase = game.current_short_phase
+    game_history.add_phase(completed_phase)
+    game_history.add_message(completed_phase, "FRANCE", "ENGLAND", "Let's split the Channel")
+    game_history.add_message(completed_phase, "GERMANY", "FRANCE", "Burgundy stays empty")
+    client = StubDiaryClient()
+    agent = DiplomacyAgent("FRANCE", client)
+
+    # lm_game writes phase-result diaries after adjudication
+    game.process()
+    assert game.current_short_phase != completed_phase
+
+    with caplog.at_level(logging.ERROR):
+        asyncio.run(agent.generate_phase_result_diary_entry(
+            game, game_history, "summary", {"FRANCE": ["A PAR H"]}, str(tmp_path / "llm.csv")
+        ))
+
+    assert not [r for r in caplog.records if r.levelno >= logging.ERROR]
+    assert len(client.prompts) == 1
+    assert "To ENGLAND: Let's split the Channel" in client.prompts[0]
+    assert "From GERMANY: Burgundy stays empty" in client.prompts[0]
+    assert "No negotiations this phase" not in client.prompts[0]
+
+
+if __name__ == "__main__":
+    import pytest
+
+    sys.exit(pytest.main([__file__, "-q"]))
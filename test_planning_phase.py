@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Test that the planning phase records each agent's plan in the game history."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ai_diplomacy.agent import DiplomacyAgent
+from ai_diplomacy.game_history import GameHistory
+from ai_diplomacy.planning import planning_phase
+from diplomacy import Game
+
+
+class StubPlanClient:
+    """Minimal stand-in for a BaseModelClient that returns a fixed plan."""
+
+    model_name = "stub-model"
+
+    def set_system_prompt(self, content):
+        pass
+
+    async def get_plan(self, game, board_state, power_name, game_history, log_file_path, **kwargs):
+        return "A plan"
+
+
+def test_planning_phase_records_plan(tmp_path):
+    game = Game()
+    game_history = GameHistory()
+    game_history.add_phase(game.current_short_phase)
+    agents = {"FRANCE": DiplomacyAgent("FRANCE", StubPlanClient())}
+    model_error_stats = {"FRANCE": {}}
+
+    asyncio.run(
+        planning_phase(game, agents, game_history, model_error_stats, str(tmp_path / "llm.csv"))
+    )
+
+    assert game_history.phases[-1].plans == {"FRANCE": "A plan"}
+    assert "planning_execution_errors" not in model_error_stats["FRANCE"]
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        test_planning_phase_records_plan(Path(tmp))
+    print("✅ Planning phase test passed!")
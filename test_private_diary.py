@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Test that the consolidated diary summary survives overflow of the bounded context diary."""
+
+import asyncio
+import sys
+from collections import deque
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ai_diplomacy.agent import DiplomacyAgent
+from ai_diplomacy.diary_logic import run_diary_consolidation
+from diplomacy import Game
+
+
+class StubDiaryClient:
+    """Minimal stand-in for a BaseModelClient that returns a fixed summary."""
+
+    model_name = "stub-model"
+
+    def set_system_prompt(self, content):
+        pass
+
+    async def generate_response(self, prompt, temperature=0.0, inject_random_seed=True, json_mode=False):
+        return "Summary of the early years"
+
+
+def test_add_diary_entry_keeps_consolidated_summary():
+    agent = DiplomacyAgent("FRANCE", StubDiaryClient())
+    summary = "[CONSOLIDATED HISTORY] Early years"
+    agent.private_diary = deque([summary], maxlen=5)
+
+    for i in range(10):
+        agent.add_diary_entry(f"Entry {i}", f"S{1901 + i}M")
+
+    assert len(agent.private_diary) == 5
+    assert agent.private_diary[0] == summary
+    assert list(agent.private_diary)[1:] == [f"[S{1901 + i}M] Entry {i}" for i in range(6, 10)]
+    assert len(agent.full_private_diary) == 10
+
+
+def test_consolidation_keeps_summary_when_kept_entries_exceed_maxlen(tmp_path):
+    agent = DiplomacyAgent("FRANCE", StubDiaryClient())
+    agent.private_diary = deque(maxlen=5)
+    for year in range(1901, 1921):
+        agent.add_diary_entry("Moves", f"S{year}M")
+
+    asyncio.run(run_diary_consolidation(agent, Game(), str(tmp_path / "llm.csv")))
+
+    assert len(agent.private_diary) == 5
+    assert agent.private_diary[0] == "[CONSOLIDATED HISTORY] Summary of the early years"
+    assert agent.private_diary[-1] == "[S1920M] Moves"
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    test_add_diary_entry_keeps_consolidated_summary()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_consolidation_keeps_summary_when_kept_entries_exceed_maxlen(Path(tmp))
+    print("✅ Private diary tests passed!")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Test order validation against the possible orders for each location."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ai_diplomacy.clients import BaseModelClient
+
+POSSIBLE_ORDERS = {
+    "PAR": ["A PAR H", "A PAR - BUR", "A PAR - PIC"],
+    "MAR": ["A MAR H", "A MAR - SPA"],
+    "BRE": ["F BRE H", "F BRE - MAO"],
+}
+
+
+def test_validate_orders_reports_dict_items_as_invalid():
+    client = BaseModelClient("test-model")
+    moves = ["A PAR - BUR", {"unit": "A MAR", "action": "- SPA"}, "F BRE - MAO"]
+
+    validated, invalid = client._validate_orders(moves, POSSIBLE_ORDERS)
+
+    # The valid orders are kept; the structured item is reported, not fatal
+    assert validated == ["A PAR - BUR", "F BRE - MAO", "A MAR H"]
+    assert invalid == [{"unit": "A MAR", "action": "- SPA"}]
+
+
+def test_validate_orders_reports_unknown_strings_as_invalid():
+    client = BaseModelClient("test-model")
+
+    validated, invalid = client._validate_orders(["A PAR - GAS", "A MAR - SPA"], POSSIBLE_ORDERS)
+
+    assert validated == ["A MAR - SPA", "A PAR H", "F BRE H"]
+    assert invalid == ["A PAR - GAS"]
+
+
+if __name__ == "__main__":
+    import pytest
+
+    sys.exit(pytest.main([__file__, "-q"]))